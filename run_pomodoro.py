@@ -0,0 +1,18 @@
+"""
+Запуск Pomodoro Timer из дерева исходников и точка входа для PyInstaller.
+
+Модули пакета импортируют друг друга относительно, поэтому
+src/pomodoro_timer/pomodoro.py нельзя запустить как отдельный скрипт.
+Этот файл добавляет src в sys.path и вызывает pomodoro_timer.pomodoro.main()
+- так же, как команда pomodoro-timer после установки пакета.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from pomodoro_timer.pomodoro import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Нагрузочный тест сервера таймеров: много сессий и задержка уведомлений о смене фазы"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+from pomodoro_timer.server import parse_address
+
+BATCH = 1000  # Запросов в одной пачке без ожидания ответов
+
+async def connect(address, attempts=50):
+    kind, host, port = parse_address(address)
+    for _ in range(attempts):
+        try:
+            if kind == 'tcp':
+                return await asyncio.open_connection(host, port, limit=1 << 20)
+            return await asyncio.open_unix_connection(host, limit=1 << 20)
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise SystemExit(f"⚠️  Сервер {address} не отвечает")
+
+async def run_client(address, count, delay, window, rng, done_by, created):
+    """Создаёт count сессий и ждёт по уведомлению на каждую"""
+    reader, writer = await connect(address)
+    for start in range(0, count, BATCH):
+        size = min(BATCH, count - start)
+        for _ in range(size):
+            work = delay + rng.uniform(0, window)
+            writer.write((json.dumps({'cmd': 'create', 'work': work, 'start': True}) + '\n').encode())
+        await writer.drain()
+        for _ in range(size):
+            reply = json.loads(await reader.readline())
+            if not reply.get('ok'):
+                raise SystemExit(f"⚠️  Ошибка сервера: {reply}")
+    created.set()
+    latencies = []
+    while len(latencies) < count:
+        try:
+            line = await asyncio.wait_for(reader.readline(), done_by - time.monotonic())
+        except asyncio.TimeoutError:
+            break
+        received = time.time()
+        message = json.loads(line)
+        if message.get('event') == 'phase-complete':
+            # Опоздание сервера к дедлайну и доставка до клиента
+            latencies.append((message['late_ms'], message['late_ms'] + (received - message['time']) * 1000))
+    writer.close()
+    return latencies
+
+async def query_stats(address):
+    reader, writer = await connect(address)
+    writer.write(b'{"cmd": "stats"}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def bench(address, sessions, clients, delay, window, seed):
+    rng = random.Random(seed)
+    setup_started = time.monotonic()
+    done_by = setup_started + delay + window + 30
+    per_client = [sessions // clients + (1 if i < sessions % clients else 0) for i in range(clients)]
+    created = [asyncio.Event() for _ in per_client]
+    tasks = [asyncio.create_task(run_client(address, n, delay, window, rng, done_by, event))
+             for n, event in zip(per_client, created)]
+    await asyncio.gather(*(event.wait() for event in created))
+    stats = await query_stats(address)
+    print(f"✓ Сессий на сервере: {stats['sessions']}, идут: {stats['running']} "
+          f"(создание заняло {time.monotonic() - setup_started:.1f} с)")
+    results = [latency for task_result in await asyncio.gather(*tasks) for latency in task_result]
+    if len(results) < sessions:
+        print(f"⚠️  Получено уведомлений: {len(results)} из {sessions}")
+    if not results:
+        return
+    for index, name in ((0, "опоздание сервера"), (1, "доставка клиенту")):
+        values = [result[index] for result in results]
+        print(f"✓ {name}, мс: p50 {percentile(values, 0.5):.2f}, p99 {percentile(values, 0.99):.2f}, "
+              f"max {max(values):.2f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера таймеров")
+    parser.add_argument('--address', default='127.0.0.1:7399',
+                        help="адрес сервера: host:port или путь к Unix-сокету")
+    parser.add_argument('--sessions', type=int, default=100000, help="число сессий")
+    parser.add_argument('--clients', type=int, default=10, help="число соединений")
+    parser.add_argument('--delay', type=float, default=20.0,
+                        help="минимальная длительность рабочей фазы, с (время на создание сессий)")
+    parser.add_argument('--window', type=float, default=10.0,
+                        help="окно, по которому разбросаны окончания фаз, с")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--external', action='store_true',
+                        help="не запускать сервер, а подключиться к уже работающему")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = None
+    if not args.external:
+        env = dict(os.environ, PYTHONPATH=SRC_DIR)
+        server = subprocess.Popen([sys.executable, '-m', 'pomodoro_timer.server', args.address], env=env)
+    try:
+        asyncio.run(bench(args.address, args.sessions, args.clients, args.delay, args.window, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -2,6 +2,9 @@
 
 # Скрипт для создания .app для macOS
 
+# Пути ниже - от корня проекта
+cd "$(dirname "$0")/.."
+
 echo "🔨 Создание исполняемого файла Pomodoro Timer..."
 
 # Установка PyInstaller если нужно
@@ -14,11 +17,12 @@ echo "🚀 Сборка приложения..."
     --name "Pomodoro Timer" \
     --windowed \
     --onefile \
-    --icon=icon.icns \
-    --add-data "alarm.wav:." \
-    --add-data "break_alarm.wav:." \
+    --icon=resources/icon.icns \
+    --add-data "src/pomodoro_timer/resources/sounds/alarm.wav:pomodoro_timer/resources/sounds" \
+    --add-data "src/pomodoro_timer/resources/sounds/break_alarm.wav:pomodoro_timer/resources/sounds" \
     --osx-bundle-identifier "com.pomodoro.timer" \
-    pomodoro.py
+    --paths src \
+    run_pomodoro.py
 
 echo "✅ Готово! Приложение находится в папке dist/"
 echo "📱 Вы можете скопировать 'Pomodoro Timer.app' на другой Mac"
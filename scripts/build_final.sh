@@ -3,6 +3,9 @@
 # Улучшенный скрипт для создания .app для macOS
 # Этот скрипт создаёт более совместимую версию приложения
 
+# Пути ниже - от корня проекта
+cd "$(dirname "$0")/.."
+
 echo "🔨 Создание Pomodoro Timer для macOS..."
 echo ""
 
@@ -24,11 +27,12 @@ echo "🚀 Сборка приложения..."
     --onedir \
     --clean \
     --noconfirm \
-    --add-data "alarm.wav:." \
-    --add-data "break_alarm.wav:." \
+    --add-data "src/pomodoro_timer/resources/sounds/alarm.wav:pomodoro_timer/resources/sounds" \
+    --add-data "src/pomodoro_timer/resources/sounds/break_alarm.wav:pomodoro_timer/resources/sounds" \
     --osx-bundle-identifier "com.pomodoro.timer" \
     --hidden-import=pygame \
-    pomodoro.py
+    --paths src \
+    run_pomodoro.py
 
 echo ""
 echo "✅ Сборка завершена!"
@@ -43,7 +47,7 @@ zip -r -q PomodoroTimer.zip PomodoroTimer.app
 cd ..
 
 # Копирование инструкции
-cp INSTALL_INSTRUCTIONS.md dist/
+cp resources/docs/INSTALL_INSTRUCTIONS.md dist/
 
 echo "✅ ZIP создан: dist/PomodoroTimer.zip"
 echo "📄 Инструкция добавлена: dist/INSTALL_INSTRUCTIONS.md"
@@ -7,8 +7,8 @@ cd "$PROJECT_ROOT"
 
 APP_NAME="Pomodoro Timer"
 BUNDLE_ID="com.pomodoro.timer"
-ENTRYPOINT="src/pomodoro_timer/pomodoro.py"
-SOUNDS_DIR="resources/sounds"
+ENTRYPOINT="run_pomodoro.py"
+PACKAGE_RESOURCES="src/pomodoro_timer/resources"
 DIST_DIR="$PROJECT_ROOT/dist"
 
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
@@ -40,13 +40,13 @@ fi
 # 3) PyInstaller build (.app bundle)
 echo "🚀 Running PyInstaller... (this may take a few minutes)"
 ADD_DATA_ARGS=(
-  --add-data "$SOUNDS_DIR/alarm.wav:resources/sounds"
-  --add-data "$SOUNDS_DIR/break_alarm.wav:resources/sounds"
+  --add-data "$PACKAGE_RESOURCES/sounds/alarm.wav:pomodoro_timer/resources/sounds"
+  --add-data "$PACKAGE_RESOURCES/sounds/break_alarm.wav:pomodoro_timer/resources/sounds"
 )
 
 # Добавляем иконку PNG для использования в pygame (если существует)
-if [ -f "resources/icon.png" ]; then
-  ADD_DATA_ARGS+=("--add-data" "resources/icon.png:resources")
+if [ -f "$PACKAGE_RESOURCES/icon.png" ]; then
+  ADD_DATA_ARGS+=("--add-data" "$PACKAGE_RESOURCES/icon.png:pomodoro_timer/resources")
 fi
 
 "$VENV_PYTHON" -m PyInstaller \
@@ -56,6 +56,7 @@ fi
   --clean \
   --noconfirm \
   --osx-bundle-identifier "$BUNDLE_ID" \
+  --paths src \
   $ICON_ARG \
   "${ADD_DATA_ARGS[@]}" \
   "$ENTRYPOINT"
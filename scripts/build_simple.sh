@@ -2,6 +2,9 @@
 
 # Простой скрипт для создания .app для macOS
 
+# Пути ниже - от корня проекта
+cd "$(dirname "$0")/.."
+
 echo "🔨 Создание исполняемого файла Pomodoro Timer..."
 
 # Установка PyInstaller
@@ -14,9 +17,10 @@ echo "🚀 Сборка приложения..."
     --name "PomodoroTimer" \
     --windowed \
     --onefile \
-    --add-data "alarm.wav:." \
-    --add-data "break_alarm.wav:." \
-    pomodoro.py
+    --add-data "src/pomodoro_timer/resources/sounds/alarm.wav:pomodoro_timer/resources/sounds" \
+    --add-data "src/pomodoro_timer/resources/sounds/break_alarm.wav:pomodoro_timer/resources/sounds" \
+    --paths src \
+    run_pomodoro.py
 
 echo ""
 echo "✅ Готово!"
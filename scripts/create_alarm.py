@@ -1,42 +1,38 @@
-import wave
-import math
-import struct
-
-def create_alarm_sound():
-    # Параметры звука
-    sample_rate = 44100  # Частота дискретизации
-    duration = 1.0  # Длительность звука в секундах
-    frequency = 880  # Частота звука (A5)
-
-    # Создание данных для звука
-    num_samples = int(sample_rate * duration)
-    sound_data = []
-
-    for i in range(num_samples):
-        # Синусоидальный сигнал
-        sample = math.sin(2 * math.pi * frequency * i / sample_rate)
-        # Добавляем небольшую амплитудную модуляцию для более интересного звука
-        amplitude = 0.5 * (1 + math.sin(2 * math.pi * 2 * i / sample_rate))
-        sample *= amplitude
-
-        # Конвертируем в 16-битный PCM
-        sample = int(sample * 32767)
-        sound_data.append(sample)
-
-    # Создание WAV файла
-    with wave.open('alarm.wav', 'w') as wav_file:
-        wav_file.setnchannels(1)  # Моно
-        wav_file.setsampwidth(2)  # 16 бит
-        wav_file.setframerate(sample_rate)
-
-        # Конвертируем данные в байты
-        bytes_data = b''
-        for sample in sound_data:
-            bytes_data += struct.pack('<h', sample)  # Little-endian 16-bit
-
-        wav_file.writeframes(bytes_data)
-
-    print("Файл alarm.wav успешно создан!")
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pomodoro_timer import synth
+
+DURATION = 1.0  # Длительность звука в секундах
+FREQUENCY = 880  # Частота звука (A5)
+
+def alarm_chunks(duration=DURATION, sample_rate=synth.SAMPLE_RATE):
+    """Генерирует сигнал будильника блоками"""
+    for start, count in synth.blocks(synth.num_samples(duration, sample_rate)):
+        t = synth.timeline(count, sample_rate, start)
+        # Синусоидальный сигнал с небольшой амплитудной модуляцией (2 Гц)
+        # для более интересного звука
+        amplitude = synth.mix((0.5, synth.sine(2, t)), offset=0.5)
+        yield synth.multiply(synth.sine(FREQUENCY, t), amplitude)
+
+def create_alarm_sound(path='alarm.wav', duration=DURATION,
+                       sample_rate=synth.SAMPLE_RATE, channels=1):
+    # WAV пишется потоково, блок за блоком
+    synth.write_wav(path, alarm_chunks(duration, sample_rate), sample_rate, channels)
+    print(f"Файл {path} успешно создан!")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация звука будильника")
+    parser.add_argument('-o', '--output', default='alarm.wav', help="путь к WAV-файлу")
+    parser.add_argument('--duration', type=float, default=DURATION, help="длительность, с")
+    parser.add_argument('--sample-rate', type=int, default=synth.SAMPLE_RATE,
+                        help="частота дискретизации, Гц")
+    parser.add_argument('--channels', type=int, default=1, choices=(1, 2),
+                        help="число каналов")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    create_alarm_sound()
+    args = parse_args()
+    create_alarm_sound(args.output, args.duration, args.sample_rate, args.channels)
@@ -1,55 +1,46 @@
-import wave
-import math
-import struct
+import argparse
+import os
+import sys
 
-def create_break_sound():
-    # Параметры звука - весёлая мелодия
-    sample_rate = 44100
-    duration = 2.0  # Немного длиннее для мелодии
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pomodoro_timer import synth
 
-    # Создаем простую мелодию (мажорное трезвучие)
-    frequencies = [523.25, 659.25, 783.99]  # C5, E5, G5
+DURATION = 2.0  # Немного длиннее для мелодии
+# Простая мелодия (мажорное трезвучие)
+FREQUENCIES = [523.25, 659.25, 783.99]  # C5, E5, G5
 
-    num_samples = int(sample_rate * duration)
-    sound_data = []
+def break_chunks(duration=DURATION, sample_rate=synth.SAMPLE_RATE):
+    """Генерирует мелодию перерыва блоками"""
+    num_samples = synth.num_samples(duration, sample_rate)
 
     # Делим время на три части для каждой ноты
     note_duration = num_samples // 3
 
-    for note_idx in range(3):
-        frequency = frequencies[note_idx]
-        start_sample = note_idx * note_duration
-        end_sample = start_sample + note_duration
-
-        for i in range(start_sample, end_sample):
-            if i < num_samples:
-                # Синусоидальный сигнал с плавным затуханием
-                sample = math.sin(2 * math.pi * frequency * i / sample_rate)
-
-                # Плавное затухание в конце каждой ноты
-                note_progress = (i - start_sample) / note_duration
-                if note_progress > 0.8:  # Затухание последних 20%
-                    amplitude = 1.0 - (note_progress - 0.8) * 5
-                else:
-                    amplitude = 1.0
-
-                sample *= amplitude * 0.7  # Общая громкость
-                sample = int(sample * 32767)
-                sound_data.append(sample)
-
-    # Создание WAV файла
-    with wave.open('break_alarm.wav', 'w') as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
-
-        bytes_data = b''
-        for sample in sound_data:
-            bytes_data += struct.pack('<h', sample)
-
-        wav_file.writeframes(bytes_data)
-
-    print("Файл break_alarm.wav успешно создан!")
+    for note_idx, frequency in enumerate(FREQUENCIES):
+        note_start = note_idx * note_duration
+        for start, count in synth.blocks(note_duration):
+            t = synth.timeline(count, sample_rate, note_start + start)
+            # Плавное затухание последних 20% каждой ноты
+            envelope = synth.release_envelope(count, 0.2, start, note_duration)
+            note = synth.multiply(synth.sine(frequency, t), envelope)
+            yield synth.mix((0.7, note))  # Общая громкость
+
+def create_break_sound(path='break_alarm.wav', duration=DURATION,
+                       sample_rate=synth.SAMPLE_RATE, channels=1):
+    # WAV пишется потоково, блок за блоком
+    synth.write_wav(path, break_chunks(duration, sample_rate), sample_rate, channels)
+    print(f"Файл {path} успешно создан!")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация звука перерыва")
+    parser.add_argument('-o', '--output', default='break_alarm.wav', help="путь к WAV-файлу")
+    parser.add_argument('--duration', type=float, default=DURATION, help="длительность, с")
+    parser.add_argument('--sample-rate', type=int, default=synth.SAMPLE_RATE,
+                        help="частота дискретизации, Гц")
+    parser.add_argument('--channels', type=int, default=1, choices=(1, 2),
+                        help="число каналов")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    create_break_sound()
+    args = parse_args()
+    create_break_sound(args.output, args.duration, args.sample_rate, args.channels)
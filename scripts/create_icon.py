@@ -171,9 +171,12 @@ def main():
     project_root = Path(__file__).parent.parent
     resources_dir = project_root / "resources"
     resources_dir.mkdir(exist_ok=True)
+    # PNG is loaded at runtime, so it ships inside the package
+    package_resources_dir = project_root / "src" / "pomodoro_timer" / "resources"
+    package_resources_dir.mkdir(parents=True, exist_ok=True)
     
     # Create high-res PNG first
-    png_path = resources_dir / "icon.png"
+    png_path = package_resources_dir / "icon.png"
     icns_path = resources_dir / "icon.icns"
     
     print("🎨 Creating icon image...")
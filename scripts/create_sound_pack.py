@@ -0,0 +1,45 @@
+"""Генерирует весь набор звуков приложения за один запуск"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from pomodoro_timer import synth
+
+import create_alarm
+import create_break_sound
+
+# Имя файла -> (генератор блоков сигнала, длительность по умолчанию)
+SOUND_PACK = {
+    'alarm.wav': (create_alarm.alarm_chunks, create_alarm.DURATION),
+    'break_alarm.wav': (create_break_sound.break_chunks, create_break_sound.DURATION),
+}
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              '..', 'src', 'pomodoro_timer', 'resources', 'sounds')
+
+def create_sound_pack(output_dir=DEFAULT_OUTPUT, sample_rate=synth.SAMPLE_RATE,
+                      channels=1, duration_scale=1.0):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, (chunks, duration) in SOUND_PACK.items():
+        duration *= duration_scale
+        path = os.path.join(output_dir, name)
+        frames = synth.write_wav(path, chunks(duration, sample_rate), sample_rate, channels)
+        print(f"✓ {name}: {frames / sample_rate:.2f} с, {sample_rate} Гц, каналов: {channels}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация набора звуков")
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUTPUT,
+                        help="каталог для WAV-файлов (по умолчанию src/pomodoro_timer/resources/sounds)")
+    parser.add_argument('--sample-rate', type=int, default=synth.SAMPLE_RATE,
+                        help="частота дискретизации, Гц")
+    parser.add_argument('--channels', type=int, default=1, choices=(1, 2),
+                        help="число каналов")
+    parser.add_argument('--duration-scale', type=float, default=1.0,
+                        help="множитель длительности всех звуков")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    create_sound_pack(args.output_dir, args.sample_rate, args.channels, args.duration_scale)
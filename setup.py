@@ -11,12 +11,15 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     package_data={
-        "pomodoro_timer": ["../resources/sounds/*.wav"],
+        "pomodoro_timer": ["resources/sounds/*.wav", "resources/icon.png"],
     },
     install_requires=[
         "pygame>=2.6.0",
         "pyinstaller>=5.0",
     ],
+    extras_require={
+        "fast": ["numpy>=1.21"],
+    },
     entry_points={
         "console_scripts": [
             "pomodoro-timer=pomodoro_timer.pomodoro:main",
@@ -0,0 +1,113 @@
+"""
+Доступ к ресурсам приложения (звуки, иконка).
+
+Ресурсы лежат в самом пакете (pomodoro_timer/resources) и ставятся вместе
+с ним как данные пакета; PyInstaller кладёт их туда же (--add-data
+...:pomodoro_timer/resources/...). Поэтому файлы ищутся независимо от
+текущего каталога через importlib.resources, а на Python 3.8 - рядом с
+модулем. Декодирование ленивое - при
+первом обращении или в фоновом потоке через preload(), а готовые объекты
+хранятся в небольшом LRU-кэше.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+from pygame import mixer
+
+try:
+    from importlib.resources import files as _package_files
+except ImportError:  # Python 3.8
+    _package_files = None
+
+RESOURCES_DIR = 'resources'
+MAX_CACHED_ASSETS = 8
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _candidates(parts):
+    """Возможные расположения ресурса resources/<parts>: данные пакета, затем каталог модуля"""
+    if _package_files is not None:
+        try:
+            resource = _package_files(__package__).joinpath(RESOURCES_DIR)
+            for part in parts:
+                resource = resource.joinpath(part)
+            yield resource
+        except (ModuleNotFoundError, TypeError):
+            pass
+    yield os.path.join(_PACKAGE_DIR, RESOURCES_DIR, *parts)
+
+
+def _is_file(candidate):
+    if isinstance(candidate, str):
+        return os.path.isfile(candidate)
+    return candidate.is_file()
+
+
+class AssetManager:
+    """Находит, лениво декодирует и кэширует ресурсы"""
+
+    def __init__(self, max_cached=MAX_CACHED_ASSETS):
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # (вид, путь) -> объект или None, если не загрузился
+        self._lock = threading.Lock()
+
+    def locate(self, *parts):
+        """Первое найденное расположение ресурса (путь или Traversable) или None"""
+        for candidate in _candidates(parts):
+            try:
+                if _is_file(candidate):
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    def _load(self, kind, parts, decode, missing=None):
+        key = (kind, parts)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            location = self.locate(*parts)
+            asset = None
+            if location is None:
+                if missing:
+                    print(missing)
+            else:
+                try:
+                    # Traversable открываем как файл: так работают и ресурсы в zip
+                    if isinstance(location, str):
+                        asset = decode(location)
+                    else:
+                        with location.open('rb') as f:
+                            asset = decode(f)
+                except (pygame.error, OSError) as e:
+                    print(f"⚠️  Не удалось загрузить {'/'.join(parts)}: {e}")
+            self._cache[key] = asset
+            if len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+            return asset
+
+    def sound(self, *parts):
+        """mixer.Sound из resources/<parts> или None"""
+        if mixer.get_init() is None:
+            return None
+        return self._load('sound', parts, mixer.Sound,
+                          f"⚠️  Файл {parts[-1]} не найден. Используем стандартный сигнал.")
+
+    def image(self, *parts):
+        """Surface из resources/<parts> или None (о пропаже сообщает вызывающий)"""
+        return self._load('image', parts, pygame.image.load)
+
+    def preload(self, *sounds):
+        """Декодирует звуки в фоновом потоке; возвращает поток"""
+        def worker():
+            for parts in sounds:
+                self.sound(*parts)
+
+        thread = threading.Thread(target=worker, name='asset-preload', daemon=True)
+        thread.start()
+        return thread
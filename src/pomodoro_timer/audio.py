@@ -0,0 +1,152 @@
+"""
+Настройка аудиовыхода и калибровка задержки.
+
+Параметры микшера (частота, число каналов, размер буфера) хранятся в
+файле настроек и передаются в mixer.pre_init() до инициализации pygame.
+Чем меньше буфер, тем меньше задержка тиков и сигналов, но тем выше риск
+заиканий на загруженной машине - calibrate() подбирает баланс.
+
+Прямо измерить звук на выходе без петли «динамик - микрофон» нельзя, поэтому
+калибровка меряет задержку от Channel.play() до того, как микшер доиграл
+короткий щелчок известной длины: лишнее сверх длины щелчка - это ожидание
+очередного аудиобуфера. До динамика звук идёт ещё один буфер, он
+добавляется к оценке. Разброс задержки под нагрузкой показывает, успевает
+ли аудиопоток при выбранном буфере.
+"""
+
+import json
+import statistics
+import threading
+import time
+
+from pygame import mixer
+
+from . import synth
+
+AUDIO_DEFAULTS = {
+    'audio_frequency': 44100,
+    'audio_channels': 2,
+    'audio_buffer': 512,
+}
+FREQUENCIES = (22050, 44100, 48000)
+CHANNEL_COUNTS = (1, 2)
+BUFFER_SIZES = (256, 512, 1024, 2048, 4096)
+
+CALIBRATION_TRIALS = 12
+CLICK_SECONDS = 0.02
+TRIAL_TIMEOUT = 1.0
+# Допустимый разброс задержки под нагрузкой (p95 - медиана), мс
+MAX_JITTER_MS = 5.0
+
+
+def validate_audio_settings(data):
+    """Значения audio_* из data с откатом к умолчаниям для недопустимых"""
+    if not isinstance(data, dict):  # В файле JSON, но не объект
+        return dict(AUDIO_DEFAULTS)
+    allowed = {'audio_frequency': FREQUENCIES, 'audio_channels': CHANNEL_COUNTS,
+               'audio_buffer': BUFFER_SIZES}
+    result = {}
+    for key, default in AUDIO_DEFAULTS.items():
+        value = data.get(key, default)
+        # Только целые: True == 1 и 44100.0 == 44100 тоже прошли бы проверку «in»
+        result[key] = value if type(value) is int and value in allowed[key] else default
+    return result
+
+
+def read_audio_settings(path):
+    """Читает параметры микшера из файла настроек (до создания Settings)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return validate_audio_settings(json.load(f))
+    except (OSError, ValueError):
+        return dict(AUDIO_DEFAULTS)
+
+
+def configure_mixer(audio_frequency, audio_channels, audio_buffer):
+    """Задаёт параметры микшера; вызывать до pygame.init() / mixer.init()"""
+    mixer.pre_init(audio_frequency, -16, audio_channels, audio_buffer)
+
+
+def _busy_load(stop):
+    """Нагрузка, похожая на работу приложения: синтез и чистый Python"""
+    while not stop.is_set():
+        synth.render_tick(synth.SAMPLE_RATE)
+        sum(i * i for i in range(20000))
+
+
+def measure_latency(trials=CALIBRATION_TRIALS, load=False):
+    """Задержки (мс) от play() до начала микширования на текущем микшере.
+
+    Возвращает список задержек; None в списке - щелчок не доигрался за
+    TRIAL_TIMEOUT (выход завис или захлебнулся).
+    """
+    frequency, size, channels = mixer.get_init()
+    click = synth.render_tick(frequency)[:synth.num_samples(CLICK_SECONDS, frequency)]
+    sound = mixer.Sound(buffer=synth.encode(click, size, channels))
+    length = sound.get_length()
+    channel = mixer.Channel(0)
+
+    stop = threading.Event()
+    loader = None
+    if load:
+        loader = threading.Thread(target=_busy_load, args=(stop,), daemon=True)
+        loader.start()
+    latencies = []
+    try:
+        for _ in range(trials):
+            started = time.perf_counter()
+            channel.play(sound)
+            while channel.get_busy() and time.perf_counter() - started < TRIAL_TIMEOUT:
+                time.sleep(0.0005)
+            elapsed = time.perf_counter() - started
+            latencies.append(None if channel.get_busy() else max(0.0, elapsed - length) * 1000)
+            channel.stop()
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        if loader is not None:
+            loader.join()
+    return latencies
+
+
+def _summary(latencies):
+    """(медиана, разброс p95 - медиана, число сбоев) по результатам замеров"""
+    done = sorted(x for x in latencies if x is not None)
+    failures = len(latencies) - len(done)
+    if not done:
+        return None, None, failures
+    median = statistics.median(done)
+    p95 = done[min(len(done) - 1, int(round(0.95 * (len(done) - 1))))]
+    return median, p95 - median, failures
+
+
+def calibrate(audio_frequency, audio_channels, buffers=BUFFER_SIZES, trials=CALIBRATION_TRIALS):
+    """Пробует размеры буфера и возвращает (рекомендуемый буфер, результаты).
+
+    Результаты - список (буфер, оценка задержки в покое и под нагрузкой по
+    медиане, разброс под нагрузкой, сбои), всё в мс. Рекомендуется наименьший
+    буфер без сбоев, у которого разброс под нагрузкой не больше MAX_JITTER_MS.
+    """
+    results = []
+    recommended = None
+    for buffer in buffers:
+        mixer.quit()
+        try:
+            mixer.init(audio_frequency, -16, audio_channels, buffer)
+        except Exception as e:
+            print(f"⚠️  Буфер {buffer}: не удалось открыть аудиовыход ({e})")
+            continue
+        idle, _, idle_failures = _summary(measure_latency(trials))
+        busy, jitter, busy_failures = _summary(measure_latency(trials, load=True))
+        failures = idle_failures + busy_failures
+        # Оценка слышимой задержки: плюс один буфер на пути к устройству
+        period = buffer / audio_frequency * 1000
+        idle = None if idle is None else idle + period
+        busy = None if busy is None else busy + period
+        results.append((buffer, idle, busy, jitter, failures))
+        if recommended is None and not failures and jitter is not None and jitter <= MAX_JITTER_MS:
+            recommended = buffer
+    mixer.quit()
+    if recommended is None and results:
+        recommended = max(result[0] for result in results)
+    return recommended, results
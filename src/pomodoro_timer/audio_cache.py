@@ -0,0 +1,117 @@
+"""
+Дисковый кэш синтезированного звука.
+
+Готовые буферы хранятся как сырой PCM в пользовательском каталоге кэша.
+Имя файла - sha256 от параметров синтеза и версии формата, так что любое
+изменение параметров (или самого алгоритма - вместе с ним повышается
+CACHE_VERSION) даёт новый ключ. При попадании файл отображается в память
+через mmap и отдаётся прямо в mixer.Sound(buffer=...), без синтеза.
+Когда кэш превышает лимит, удаляются файлы, которые дольше всех не
+использовались.
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+
+# Повышается при изменении алгоритмов синтеза или формата файлов
+CACHE_VERSION = 1
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+SUFFIX = '.pcm'
+
+
+def user_cache_dir():
+    """Каталог кэшей приложения с учётом соглашений платформы"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'pomodoro_timer')
+
+
+def default_cache_dir():
+    """Каталог кэша звуков"""
+    return os.path.join(user_cache_dir(), 'audio')
+
+
+class AudioCache:
+    """Кэш PCM-буферов на диске с адресацией по содержимому параметров"""
+
+    def __init__(self, directory=None, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*params):
+        """Ключ для набора параметров синтеза (должны иметь стабильный repr)"""
+        return hashlib.sha256(repr((CACHE_VERSION,) + params).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key):
+        """Возвращает отображённый в память буфер или None, если его нет в кэше"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # Время изменения служит отметкой последнего использования
+            os.utime(path)
+        except (OSError, ValueError):  # нет файла, пустой файл, нет доступа
+            return None
+        return buffer
+
+    def store(self, key, data):
+        """Атомарно записывает буфер и при необходимости освобождает место"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Не удалось сохранить звук в кэш: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self.evict(keep=path)
+
+    def get_or_render(self, params, render):
+        """Буфер для params: из кэша или render() с сохранением результата"""
+        key = self.key(*params)
+        buffer = self.load(key)
+        if buffer is None:
+            buffer = render()
+            self.store(key, buffer)
+        return buffer
+
+    def evict(self, keep=None):
+        """Удаляет самые давно использованные файлы, пока кэш больше лимита"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(SUFFIX) and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,203 @@
+"""
+Ядро таймера Pomodoro без зависимостей от pygame.
+
+TimerCore - только машина состояний: фаза (работа, короткий или длинный
+перерыв), номер сессии и обратный отсчёт (Countdown). Звук, анимация и
+отрисовка живут во внешнем представлении (PomodoroTimer), которое вызывает
+update() и реагирует на возвращённые события:
+
+    TICK            - сменилась показываемая секунда остатка;
+    PHASE_COMPLETE  - фаза закончилась (в событии - завершённая фаза);
+    LONG_BREAK      - следующей фазой начинается длинный перерыв;
+    PHASE_ABORTED   - начатую фазу прервали сбросом (возвращает reset()).
+
+Экземпляр занимает пару сотен байт (__slots__), ничего не рисует и не
+запускает потоков, а часы можно подменить - так что в одном процессе
+можно держать десятки тысяч таймеров (сервер, симуляции).
+"""
+
+from collections import namedtuple
+
+from .timekeeping import Countdown
+
+# Фазы
+WORK = 'work'
+SHORT_BREAK = 'short_break'
+LONG_BREAK_PHASE = 'long_break'
+
+# Виды событий
+TICK = 'tick'
+PHASE_COMPLETE = 'phase-complete'
+LONG_BREAK = 'long-break'
+PHASE_ABORTED = 'phase-aborted'
+
+SESSIONS_PER_LONG_BREAK = 4
+
+# Событие ядра: вид, фаза (для PHASE_COMPLETE - завершённая), номер
+# сессии, остаток фазы в целых секундах и полная длительность этой фазы
+TimerEvent = namedtuple('TimerEvent', 'kind phase session_count remaining duration')
+
+_NO_EVENTS = ()
+
+
+class TimerCore:
+    """Машина состояний Pomodoro: фазы, сессии и отсчёт"""
+
+    __slots__ = ('work_seconds', 'short_break_seconds', 'long_break_seconds',
+                 'is_work_time', 'session_count', 'countdown', '_shown')
+
+    def __init__(self, work_seconds, short_break_seconds, long_break_seconds, clock=None):
+        self.work_seconds = work_seconds
+        self.short_break_seconds = short_break_seconds
+        self.long_break_seconds = long_break_seconds
+        self.is_work_time = True
+        self.session_count = 0
+        # Отсчёт идёт по монотонному дедлайну; clock можно подменить
+        self.countdown = Countdown(work_seconds, clock)
+        self._shown = self.countdown.remaining_seconds()  # Последняя отданная в TICK секунда
+
+    def set_durations(self, work_seconds, short_break_seconds, long_break_seconds):
+        """Меняет длительности фаз.
+
+        Начатая фаза (идущая или на паузе после старта) досчитывается как
+        есть; ещё не начатая сразу получает новую длительность.
+        """
+        if (work_seconds == self.work_seconds and short_break_seconds == self.short_break_seconds
+                and long_break_seconds == self.long_break_seconds):
+            return
+        untouched = not self.phase_started()
+        self.work_seconds = work_seconds
+        self.short_break_seconds = short_break_seconds
+        self.long_break_seconds = long_break_seconds
+        if untouched:
+            self.countdown.reset(self._configured_seconds())
+            self._shown = self.countdown.remaining_seconds()
+
+    @property
+    def clock(self):
+        return self.countdown.clock
+
+    @property
+    def is_running(self):
+        return self.countdown.running
+
+    @property
+    def phase(self):
+        """Текущая фаза: WORK, SHORT_BREAK или LONG_BREAK_PHASE"""
+        if self.is_work_time:
+            return WORK
+        if self.session_count > 0 and self.session_count % SESSIONS_PER_LONG_BREAK == 0:
+            return LONG_BREAK_PHASE
+        return SHORT_BREAK
+
+    def _configured_seconds(self):
+        """Длительность текущей фазы по настройкам (для фазы, которая ещё не начата)"""
+        phase = self.phase
+        if phase == WORK:
+            return self.work_seconds
+        if phase == LONG_BREAK_PHASE:
+            return self.long_break_seconds
+        return self.short_break_seconds
+
+    def phase_seconds(self):
+        """Полная длительность текущей фазы - та, с которой идёт её отсчёт.
+
+        Если длительности поменяли посреди начатой фазы, она досчитывается
+        со старой длительностью - её и возвращаем, чтобы доля пройденного
+        совпадала с остатком.
+        """
+        return self.countdown.duration
+
+    def remaining_seconds(self):
+        """Остаток фазы в целых секундах (с округлением вверх)"""
+        return self.countdown.remaining_seconds()
+
+    def progress(self):
+        """Пройденная доля текущей фазы (0..1)"""
+        duration = self.countdown.duration
+        if duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, 1.0 - self.countdown.remaining() / duration))
+
+    def seconds_until_tick(self):
+        """Через сколько секунд будет следующее событие (None, если таймер стоит)"""
+        if not self.countdown.running:
+            return None
+        remaining = self.countdown.remaining()
+        return remaining - (self.countdown.remaining_seconds() - 1)
+
+    def deadline(self):
+        """Момент окончания фазы по часам ядра (None, если таймер стоит)"""
+        if not self.countdown.running:
+            return None
+        return self.countdown.clock() + self.countdown.remaining()
+
+    def phase_started(self):
+        """Начата ли текущая фаза (идёт или стоит на паузе после старта)"""
+        countdown = self.countdown
+        return countdown.running or countdown.remaining() < countdown.duration
+
+    def start(self):
+        self.countdown.start()
+
+    def pause(self):
+        self.countdown.pause()
+
+    def toggle(self):
+        if self.countdown.running:
+            self.countdown.pause()
+        else:
+            self.countdown.start()
+
+    def interrupt(self):
+        """Событие прерывания начатой фазы (пустой кортеж, если она не начата).
+
+        Состояние не меняется: так можно записать фазу, прерванную выходом.
+        """
+        if not self.phase_started():
+            return _NO_EVENTS
+        countdown = self.countdown
+        return (TimerEvent(PHASE_ABORTED, self.phase, self.session_count,
+                           countdown.remaining_seconds(), countdown.duration),)
+
+    def reset(self):
+        """Возвращает таймер к началу первой рабочей сессии.
+
+        Возвращает события: PHASE_ABORTED, если начатая фаза прервана.
+        """
+        events = self.interrupt()
+        self.is_work_time = True
+        self.session_count = 0
+        self.countdown.reset(self.work_seconds)
+        self._shown = self.countdown.remaining_seconds()
+        return events
+
+    def switch_mode(self):
+        """Переходит к следующей фазе; она начинается на паузе"""
+        if self.is_work_time:
+            self.session_count += 1
+            self.is_work_time = False
+        else:
+            self.is_work_time = True
+        self.countdown.reset(self._configured_seconds())
+        self._shown = self.countdown.remaining_seconds()
+
+    def update(self):
+        """Продвигает таймер и возвращает кортеж событий (пустой, если ничего не случилось)"""
+        countdown = self.countdown
+        if not countdown.running:
+            return _NO_EVENTS
+        if countdown.expired():
+            finished = self.phase
+            duration = countdown.duration
+            self.switch_mode()
+            complete = TimerEvent(PHASE_COMPLETE, finished, self.session_count, 0, duration)
+            if self.phase == LONG_BREAK_PHASE:
+                return (complete, TimerEvent(LONG_BREAK, LONG_BREAK_PHASE, self.session_count,
+                                             self._shown, countdown.duration))
+            return (complete,)
+        remaining = countdown.remaining_seconds()
+        if remaining == self._shown:
+            return _NO_EVENTS
+        self._shown = remaining
+        return (TimerEvent(TICK, self.phase, self.session_count, remaining, countdown.duration),)
@@ -0,0 +1,98 @@
+"""
+Кэш системных шрифтов.
+
+pygame.font.SysFont() при первом вызове перебирает все шрифты системы (на
+Linux - через fc-list), что на слабых машинах занимает заметную часть
+холодного старта. Здесь имя семейства один раз разрешается в путь к
+файлу - по тем же правилам, что и в SysFont, - и сохраняется в небольшом
+JSON-файле; дальше шрифты создаются напрямую через pygame.font.Font(path,
+size). Пересобрать кэш можно командой pomodoro-timer --rebuild-font-cache.
+"""
+
+import json
+import os
+import sys
+
+import pygame
+
+from .audio_cache import user_cache_dir
+
+FONT_CACHE_VERSION = 1
+# Запасные семейства, если нет ни Arial, ни его псевдонимов из pygame
+FALLBACK_FAMILIES = ('dejavusans', 'freesans', 'notosans')
+# Шрифты, которые использует приложение: (семейство, жирный)
+APP_FONTS = (('Arial', False), ('Arial', True))
+
+
+def default_cache_file():
+    return os.path.join(user_cache_dir(), 'fonts.json')
+
+
+def _resolved(path, size, bold, italic):
+    """Конструктор для SysFont: вместо шрифта возвращает результат поиска"""
+    return path, bold
+
+
+class FontCache:
+    """Разрешает семейства в файлы шрифтов и создаёт шрифты без перебора системы"""
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or default_cache_file()
+        self._paths = None  # "семейство|жирный" -> [путь или None, нужен ли искусственный жирный]
+        self._fonts = {}  # (семейство, размер, жирный) -> Font
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == FONT_CACHE_VERSION and data.get('platform') == sys.platform:
+                return data.get('fonts', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self):
+        data = {'version': FONT_CACHE_VERSION, 'platform': sys.platform, 'fonts': self._paths}
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"⚠️  Не удалось сохранить кэш шрифтов: {e}")
+
+    def resolve(self, family, bold=False):
+        """(путь к файлу или None для встроенного шрифта, нужен ли искусственный жирный)"""
+        if self._paths is None:
+            self._paths = self._load()
+        key = f"{family}|{int(bold)}"
+        entry = self._paths.get(key)
+        if entry is None or (entry[0] is not None and not os.path.isfile(entry[0])):
+            # Промах или шрифт удалён - ищем так же, как SysFont
+            names = [family] + list(FALLBACK_FAMILIES)
+            entry = list(pygame.font.SysFont(names, 1, bold, constructor=_resolved))
+            self._paths[key] = entry
+            self._save()
+        return tuple(entry)
+
+    def font(self, family, size, bold=False):
+        """Шрифт family размера size; одинаковые запросы получают один объект"""
+        key = (family, size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            path, fake_bold = self.resolve(family, bold)
+            font = self._fonts[key] = pygame.font.Font(path, size)
+            if fake_bold:
+                font.set_bold(True)
+        return font
+
+    def rebuild(self, families=APP_FONTS):
+        """Забывает найденные пути и заново ищет шрифты приложения"""
+        self._paths = {}
+        self._fonts.clear()
+        for family, bold in families:
+            path, fake_bold = self.resolve(family, bold)
+            style = " (жирный)" if bold else ""
+            suffix = ", искусственный жирный" if fake_bold else ""
+            print(f"✓ {family}{style}: {path or 'встроенный шрифт pygame'}{suffix}")
@@ -0,0 +1,219 @@
+"""
+Журнал завершённых и прерванных фаз.
+
+Каждая фаза - одна запись фиксированного размера (RECORD, 32 байта):
+начало и конец по настенным часам, плановая и фактически отсчитанная
+длительность, вид фазы, флаг прерывания и номер сессии. Записи
+дописываются в конец текущего файла журнала; когда он дорастает до
+MAX_FILE_BYTES, начинается следующий (history-000002.bin и т.д.).
+
+HistoryLog.append() только упаковывает запись и кладёт её в очередь -
+на диск её пишет фоновый поток, так что кадр не ждёт файловую систему.
+HistoryReader отображает файлы в память (mmap) и распаковывает записи
+через struct.iter_unpack() - годы истории читаются без разбора текста.
+Хвост от записи, оборванной при падении процесса, читатель пропускает,
+а писатель обрезает перед тем, как дописывать.
+"""
+
+import glob
+import mmap
+import os
+import queue
+import struct
+import threading
+from collections import namedtuple
+
+from .core import LONG_BREAK_PHASE, SHORT_BREAK, WORK
+
+HISTORY_DIR = os.path.expanduser("~/.pomodoro_timer_history")
+FILE_PATTERN = 'history-{:06d}.bin'
+MAX_FILE_BYTES = 4 * 1024 * 1024  # ~130 тысяч записей на файл
+
+MAGIC = b'PMHL'
+FORMAT_VERSION = 1
+# Заголовок файла: сигнатура, версия формата, размер записи
+HEADER = struct.Struct('<4sHH8x')
+# Запись: начало и конец (unix time), плановая и отсчитанная длительность (с),
+# вид фазы, флаги, номер сессии
+RECORD = struct.Struct('<ddffBBH4x')
+
+PHASES = (WORK, SHORT_BREAK, LONG_BREAK_PHASE)  # Код фазы - индекс в кортеже
+FLAG_INTERRUPTED = 0x01
+
+HistoryRecord = namedtuple('HistoryRecord',
+                           'started_at ended_at planned active phase interrupted session_count')
+
+
+def pack_record(started_at, ended_at, planned, active, phase, interrupted, session_count):
+    flags = FLAG_INTERRUPTED if interrupted else 0
+    return RECORD.pack(started_at, ended_at, planned, active, PHASES.index(phase), flags,
+                       min(session_count, 0xFFFF))
+
+
+def _history_files(directory):
+    """Файлы журнала по порядку"""
+    return sorted(glob.glob(os.path.join(directory, FILE_PATTERN.replace('{:06d}', '[0-9]' * 6))))
+
+
+class HistoryLog:
+    """Дописывает записи в журнал из фонового потока"""
+
+    def __init__(self, directory=HISTORY_DIR, max_file_bytes=MAX_FILE_BYTES):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._file = None
+        self._index = 0  # Номер текущего файла
+
+    def append(self, started_at, ended_at, planned, active, phase, interrupted=False,
+               session_count=0):
+        """Ставит запись в очередь на запись; O(1) и не трогает диск"""
+        self._queue.put(pack_record(started_at, ended_at, planned, active, phase,
+                                    interrupted, session_count))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+
+    def _open_next(self):
+        """Открывает новый файл журнала с заголовком"""
+        self._index += 1
+        path = os.path.join(self.directory, FILE_PATTERN.format(self._index))
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+
+    def _open(self):
+        """Открывает последний файл журнала для дописывания"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = _history_files(self.directory)
+        if not files:
+            self._open_next()
+            return
+        path = files[-1]
+        self._index = int(os.path.basename(path)[8:14])
+        size = os.path.getsize(path)
+        if size < HEADER.size:
+            os.remove(path)  # Файл оборвался на заголовке
+            self._index -= 1
+            self._open_next()
+            return
+        # Обрезаем недописанную запись, чтобы следующие легли по границе
+        whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+        if whole != size:
+            os.truncate(path, whole)
+        self._file = open(path, 'ab')
+
+    def _write(self, data):
+        if self._file is None:
+            self._open()
+        elif self._file.tell() + len(data) > self.max_file_bytes:
+            self._file.close()
+            self._open_next()
+        self._file.write(data)
+        self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _run(self):
+        # Файлом владеет только этот поток: он же закрывает его по сигналу
+        # остановки, так что запись не может попасть в закрытый файл
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                try:
+                    self._write(data)
+                except OSError as e:
+                    print(f"⚠️  Не удалось записать историю: {e}")
+                    # Следующая запись откроет файл заново (и обрежет оборванный хвост)
+                    self._close_file()
+        finally:
+            self._close_file()
+
+    def close(self):
+        """Дописывает очередь и закрывает файл.
+
+        Ждёт поток записи без таймаута: в очереди лишь несколько коротких
+        записей, а брошенная на полпути потеряла бы последнюю из них.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+class HistoryReader:
+    """Читает журнал через mmap без разбора текста"""
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+
+    def _mapped(self, path):
+        """Отображение файла в память или None для пустого/чужого файла"""
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # нет доступа или пустой файл
+            return None
+        if len(buffer) < HEADER.size:
+            buffer.close()
+            return None
+        magic, version, record_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            print(f"⚠️  {os.path.basename(path)}: неизвестный формат, пропускаем")
+            buffer.close()
+            return None
+        return buffer
+
+    def raw_records(self, since=None):
+        """Кортежи полей RECORD по порядку; since - пропустить записи, кончившиеся раньше"""
+        for path in _history_files(self.directory):
+            buffer = self._mapped(path)
+            if buffer is None:
+                continue
+            try:
+                count = (len(buffer) - HEADER.size) // RECORD.size
+                if count == 0:
+                    continue
+                end = HEADER.size + count * RECORD.size
+                # Файлы хронологические: старый файл отбрасываем по последней записи
+                if since is not None and RECORD.unpack_from(buffer, end - RECORD.size)[1] < since:
+                    continue
+                view = memoryview(buffer)[HEADER.size:end]
+                unpacked = RECORD.iter_unpack(view)
+                try:
+                    for fields in unpacked:
+                        if since is None or fields[1] >= since:
+                            yield fields
+                finally:
+                    # Отображение можно закрыть, только когда на него нет ссылок
+                    del unpacked
+                    view.release()
+            finally:
+                buffer.close()
+
+    def records(self, since=None):
+        """HistoryRecord по порядку"""
+        for started_at, ended_at, planned, active, phase, flags, session_count in self.raw_records(since):
+            yield HistoryRecord(started_at, ended_at, planned, active,
+                                PHASES[phase] if phase < len(PHASES) else None,
+                                bool(flags & FLAG_INTERRUPTED), session_count)
+
+    def summary(self, since=None):
+        """Сводка: {фаза: [завершено, прервано, отсчитано секунд]}"""
+        totals = {phase: [0, 0, 0.0] for phase in PHASES}
+        for _, _, _, active, phase, flags, _ in self.raw_records(since):
+            if phase >= len(PHASES):
+                continue
+            entry = totals[PHASES[phase]]
+            entry[1 if flags & FLAG_INTERRUPTED else 0] += 1
+            entry[2] += active
+        return totals
@@ -0,0 +1,224 @@
+"""
+Метроном, не зависящий от кадров.
+
+Рисунок метронома (темп, размер, акцент сильной доли, дробление и разгон
+темпа за рабочую сессию) описывается MetronomePattern. Каждый такой такт
+рендерится в буфер один раз в фоновом пуле потоков и хранится в LRU-кэше,
+так что смена темпа в настройках никогда не задерживает кадр. Отрендеренные
+такты сохраняются и в дисковом кэше (AudioCache), поэтому при следующих
+запусках они только читаются с диска.
+
+Буферы непрерывно подаются в выделенный канал микшера через
+Channel.queue(): пока играет один буфер, следующий уже стоит в очереди.
+Поэтому моменты тиков задают аудиочасы микшера, а не главный цикл - тот
+лишь подкладывает очередной буфер, когда канал сообщает о конце звука
+событием METRONOME_EVENT (им же пул сообщает о готовом такте).
+"""
+
+import math
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from pygame import mixer
+
+from . import synth
+from .audio_cache import AudioCache
+
+# Буфер не короче этого: пока играет он и следующий в очереди, главный
+# цикл успеет проснуться (в простое он просыпается раз в секунду)
+MIN_BAR_SECONDS = 2.0
+TICK_VOLUME = 0.22  # мягкий, но читаемый уровень
+# Зарезервированные каналы микшера: Sound.play() их не занимает
+METRONOME_CHANNEL = 0
+MUSIC_CHANNEL = 1  # Фоновая музыка (см. music)
+RESERVED_CHANNELS = 2
+BAR_CACHE_SIZE = 16  # Сколько отрендеренных тактов держать в памяти
+RENDER_WORKERS = 2
+
+# Допустимые значения настроек
+MIN_BPM = 30
+MAX_BPM = 200
+SIGNATURES = ((2, 4), (3, 4), (4, 4), (5, 4), (6, 8), (7, 8))
+SUBDIVISIONS = (1, 2, 3, 4)
+MAX_RAMP_BPM = 60
+
+# Громкость и высота тиков: сильная доля, обычная доля, дробление
+ACCENT_TICK = (1.0, 1.5)
+BEAT_TICK = (1.0, 1.0)
+SUBDIVISION_TICK = (0.45, 1.0)
+
+# Событие окончания буфера в канале метронома или готовности такта
+METRONOME_EVENT = pygame.event.custom_type()
+
+# Рисунок метронома: темп (уд/мин), размер, акцент сильной доли,
+# дробление доли и изменение темпа к концу рабочей фазы (уд/мин)
+MetronomePattern = namedtuple('MetronomePattern', 'bpm signature accent subdivision ramp')
+
+# Один конкретный такт: рисунок с уже применённым разгоном
+BarSpec = namedtuple('BarSpec', 'bpm beats accent subdivision')
+
+
+def bar_at(pattern, progress):
+    """Такт, который должен звучать на доле progress (0..1) рабочей фазы.
+
+    Темп разгона округляется до целых ударов в минуту, так что за фазу
+    встречается не больше |ramp| + 1 разных тактов.
+    """
+    bpm = pattern.bpm + int(round(pattern.ramp * min(1.0, max(0.0, progress))))
+    bpm = min(MAX_BPM, max(MIN_BPM, bpm))
+    return BarSpec(bpm, pattern.signature[0], pattern.accent, pattern.subdivision)
+
+
+def render_bar(spec, audio_format):
+    """Рендерит такт spec в PCM-байты формата микшера (вызывается в пуле потоков).
+
+    Такт повторяется целое число раз, чтобы буфер был не короче MIN_BAR_SECONDS.
+    """
+    frequency, size, channels = audio_format
+    clips = {}
+    for kind, (gain, pitch) in (('accent', ACCENT_TICK), ('beat', BEAT_TICK),
+                                ('sub', SUBDIVISION_TICK)):
+        clips[kind] = (gain, synth.render_tick(frequency, pitch=pitch))
+
+    beat = 60.0 / spec.bpm * frequency
+    pulses = spec.beats * spec.subdivision
+    bar = int(round(beat * spec.beats))
+    repeats = max(1, math.ceil(MIN_BAR_SECONDS * frequency / bar))
+
+    events = []
+    for repeat in range(repeats):
+        for pulse in range(pulses):
+            if pulse == 0 and spec.accent:
+                kind = 'accent'
+            elif pulse % spec.subdivision == 0:
+                kind = 'beat'
+            else:
+                kind = 'sub'
+            gain, clip = clips[kind]
+            events.append((repeat * bar + int(round(pulse * beat / spec.subdivision)), gain, clip))
+    signal = synth.sequence(bar * repeats, events)
+    return synth.encode(signal, size, channels)
+
+
+def load_bar(cache, spec, audio_format):
+    """Такт из дискового кэша, а при промахе - render_bar() с сохранением"""
+    params = ('metronome-bar', tuple(spec), tuple(audio_format), MIN_BAR_SECONDS,
+              ACCENT_TICK, BEAT_TICK, SUBDIVISION_TICK)
+    return cache.get_or_render(params, lambda: render_bar(spec, audio_format))
+
+
+def _notify(future):
+    """Будит главный цикл, когда такт готов"""
+    try:
+        pygame.event.post(pygame.event.Event(METRONOME_EVENT))
+    except pygame.error:
+        pass  # pygame уже завершён
+
+
+class Metronome:
+    """Играет рисунок метронома в собственном канале микшера"""
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else AudioCache()
+        self.channel = None
+        self.pattern = None
+        self._playing = None  # Такт, который сейчас в канале
+        self._bars = OrderedDict()  # BarSpec -> Sound (LRU)
+        self._pending = {}  # BarSpec -> Future с PCM-буфером
+        self._failed = set()  # Такты, которые не удалось подготовить: они молчат
+        self._executor = None
+        self._format = mixer.get_init()
+        if self._format is None:
+            return  # Звука нет - метроном молчит
+        # Резервируем канал, чтобы Sound.play() не занимал его сигналами
+        mixer.set_reserved(RESERVED_CHANNELS)
+        self.channel = mixer.Channel(METRONOME_CHANNEL)
+        self.channel.set_endevent(METRONOME_EVENT)
+        self._executor = ThreadPoolExecutor(RENDER_WORKERS, thread_name_prefix='metronome')
+
+    def _request(self, spec):
+        """Возвращает готовый Sound такта или ставит его рендер в очередь пула"""
+        sound = self._bars.get(spec)
+        if sound is not None:
+            self._bars.move_to_end(spec)
+            return sound
+        if spec in self._failed:
+            return None
+        future = self._pending.get(spec)
+        if future is None:
+            future = self._pending[spec] = self._executor.submit(load_bar, self.cache, spec, self._format)
+            future.add_done_callback(_notify)
+            return None
+        if not future.done():
+            return None
+        del self._pending[spec]
+        # Sound создаётся в главном потоке: это лишь копия готовых байтов
+        data = None
+        try:
+            data = future.result()
+            sound = mixer.Sound(buffer=data)
+        except Exception as e:
+            # Ошибка рендера, кэша или микшера не должна ронять приложение:
+            # этот такт просто молчит и повторно не рендерится
+            print(f"⚠️  Не удалось подготовить такт метронома ({spec.bpm} уд/мин): {e}")
+            self._failed.add(spec)
+            self._bars.pop(spec, None)
+            return None
+        finally:
+            if hasattr(data, 'close'):
+                data.close()  # отображение файла кэша больше не нужно
+        sound.set_volume(TICK_VOLUME)
+        self._bars[spec] = sound
+        if len(self._bars) > BAR_CACHE_SIZE:
+            self._bars.popitem(last=False)
+        return sound
+
+    def sync(self, active, pattern, progress=0.0):
+        """Приводит метроном к нужному состоянию; вызывается каждую итерацию цикла.
+
+        active - должны ли сейчас звучать тики, pattern - MetronomePattern,
+        progress - пройденная доля рабочей фазы (для разгона темпа).
+        Смена рисунка начинает новый такт сразу, как только он отрендерен;
+        разгон подменяет такт бесшовно, на границе буферов.
+        """
+        if self.channel is None:
+            return
+        if not active:
+            if self.channel.get_busy():
+                self.channel.stop()
+            self._playing = None
+            return
+
+        spec = bar_at(pattern, progress)
+        sound = self._request(spec)
+        if pattern.ramp:
+            # Следующий шаг разгона рендерится заранее
+            self._request(bar_at(pattern, progress + 1.0 / abs(pattern.ramp)))
+
+        if pattern != self.pattern or not self.channel.get_busy():
+            if sound is not None:
+                self.pattern = pattern
+                self._playing = spec
+                self.channel.play(sound)
+            elif not self.channel.get_busy():
+                return  # Такт ещё рендерится; пул разбудит цикл
+        if self.channel.get_queue() is None:
+            if sound is None:
+                # Очередной шаг разгона не готов - повторяем текущий такт
+                sound = self._bars.get(self._playing)
+            else:
+                self._playing = spec
+            if sound is not None:
+                self.channel.queue(sound)
+
+    def close(self):
+        """Останавливает звук и фоновый пул"""
+        if self.channel is not None:
+            self.channel.stop()
+        if self._executor is not None:
+            # shutdown(cancel_futures=True) есть только с Python 3.9
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._executor.shutdown(wait=False)
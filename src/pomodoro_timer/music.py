@@ -0,0 +1,187 @@
+"""
+Генеративная фоновая музыка для рабочих сессий.
+
+focus_music() - бесконечный генератор коротких кусков эмбиент-фортепиано:
+медленная последовательность аккордов (мягкие пэды) и случайная мелодия
+из звуков аккорда. Каждый голос - синус с экспоненциальной огибающей, как
+и остальные звуки приложения (см. synth). Голоса живут, пока не затихнут,
+поэтому память не зависит от длительности сессии.
+
+MusicPlayer в отдельном потоке берёт куски из генератора и подаёт их в
+выделенный канал микшера через Channel.queue(): в памяти одновременно
+не больше трёх кусков (играющий, стоящий в очереди и следующий готовый).
+"""
+
+import math
+import random
+import threading
+import time
+
+from pygame import mixer
+
+from . import synth
+from .metronome import MUSIC_CHANNEL, RESERVED_CHANNELS
+
+CHUNK_SECONDS = 0.5  # Длина одного куска
+TEMPO_BPM = 72
+NOTE_PROBABILITY = 0.35  # Вероятность ноты мелодии на каждой восьмой
+MUSIC_VOLUME = 0.35
+FADE_SECONDS = 1.5  # Длительность затухания при остановке
+FADE_STEPS = 30
+POLL_SECONDS = CHUNK_SECONDS / 4  # Как часто поток проверяет очередь канала
+
+# Аккорды (MIDI-номера нот): Cmaj7 - Am7 - Fmaj7 - G6, по такту на аккорд
+PROGRESSION = ((48, 52, 55, 59), (45, 48, 52, 55), (41, 45, 48, 52), (43, 47, 50, 52))
+
+# Голоса: (громкость, затухание tau, атака, обертоны (кратность, громкость))
+PAD_VOICE = (0.07, 2.2, 0.6, ((1.0, 1.0), (1.003, 0.6)))
+PIANO_VOICE = (0.16, 1.1, 0.005, ((1.0, 1.0), (2.0, 0.4), (3.0, 0.15)))
+VOICE_TAUS = 5  # Голос обрывается через столько tau (огибающая < 0.007)
+ATTACK_TAUS = 8  # После стольких постоянных атаки она считается завершённой
+
+
+def midi_to_hz(note):
+    return 440.0 * 2 ** ((note - 69) / 12)
+
+
+def _render_voice(frequency, voice, t, decay):
+    """Кусок голоса в локальные моменты t (от начала ноты).
+
+    decay - затухание exp(-t / tau) этого куска; его форма для всех голосов
+    с одним tau одинакова, различается только начальный уровень.
+    """
+    _, tau, attack, partials = voice
+    tone = synth.mix(*[(gain, synth.sine(frequency * ratio, t)) for ratio, gain in partials])
+    if t[0] > ATTACK_TAUS * attack:
+        return synth.multiply(tone, decay)
+    # Плавная атака 1 - exp(-t / attack)
+    rise = synth.mix((-1.0, synth.exp_envelope(attack, t)), offset=1.0)
+    return synth.multiply(tone, rise, decay)
+
+
+def focus_music(sample_rate=synth.SAMPLE_RATE, seed=None, chunk_seconds=CHUNK_SECONDS):
+    """Бесконечный генератор кусков музыки по chunk_seconds секунд"""
+    rng = random.Random(seed)
+    chunk = synth.num_samples(chunk_seconds, sample_rate)
+    step = int(round(60.0 / TEMPO_BPM / 2 * sample_rate))  # восьмая
+    voices = []  # (начало в отсчётах, частота, голос, длина в отсчётах)
+    position = 0
+    next_slot = 0
+    slot = 0
+
+    # Форма затухания на длине куска для каждого tau: голосу остаётся
+    # умножить её на свой уровень exp(-local / tau) в начале куска
+    head = synth.timeline(chunk, sample_rate)
+    decays = {voice[1]: synth.exp_envelope(voice[1], head) for voice in (PAD_VOICE, PIANO_VOICE)}
+
+    def add(start, note, voice):
+        length = int((voice[1] * VOICE_TAUS + voice[2]) * sample_rate)
+        voices.append((start, midi_to_hz(note), voice, length))
+
+    while True:
+        end = position + chunk
+        # Раскладываем новые ноты, попадающие в этот кусок
+        while next_slot < end:
+            chord = PROGRESSION[(slot // 8) % len(PROGRESSION)]
+            if slot % 8 == 0:
+                for note in chord[:3]:
+                    add(next_slot, note, PAD_VOICE)
+            if rng.random() < NOTE_PROBABILITY:
+                add(next_slot, rng.choice(chord) + rng.choice((24, 24, 36)), PIANO_VOICE)
+            next_slot += step
+            slot += 1
+
+        events = []
+        alive = []
+        for voice_entry in voices:
+            start, frequency, voice, length = voice_entry
+            offset = max(0, start - position)  # где голос начинается в куске
+            local = max(0, position - start)  # сколько голос уже звучал
+            count = min(chunk - offset, length - local)
+            if count > 0:
+                t = synth.timeline(count, sample_rate, local)
+                tau = voice[1]
+                decay = synth.mix((math.exp(-local / sample_rate / tau), decays[tau][:count]))
+                events.append((offset, voice[0], _render_voice(frequency, voice, t, decay)))
+            if start + length > end:
+                alive.append(voice_entry)
+        voices = alive
+        position = end
+        yield synth.sequence(chunk, events)
+
+
+class MusicPlayer:
+    """Проигрывает focus_music() в своём канале из фонового потока"""
+
+    def __init__(self):
+        self.channel = None
+        self._active = False
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = None
+        self._format = mixer.get_init()
+        if self._format is None:
+            return  # Звука нет - музыка молчит
+        mixer.set_reserved(RESERVED_CHANNELS)
+        self.channel = mixer.Channel(MUSIC_CHANNEL)
+
+    def sync(self, active):
+        """Включает музыку или плавно её гасит; вызывается каждую итерацию цикла"""
+        if self.channel is None or active == self._active:
+            return
+        self._active = active
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='focus-music', daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        frequency, size, channels = self._format
+        chunks = None
+        pending = None
+        while not self._closed:
+            if self._active:
+                if chunks is None:
+                    chunks = focus_music(frequency)
+                    self.channel.set_volume(1.0)
+                if pending is None:
+                    pending = mixer.Sound(buffer=synth.encode(next(chunks), size, channels))
+                    pending.set_volume(MUSIC_VOLUME)
+                if not self.channel.get_busy():
+                    self.channel.play(pending)
+                    pending = None
+                elif self.channel.get_queue() is None:
+                    self.channel.queue(pending)
+                    pending = None
+                else:
+                    self._wake.wait(POLL_SECONDS)
+                    self._wake.clear()
+            elif chunks is not None:
+                self._fade_out()
+                chunks = pending = None
+            else:
+                self._wake.wait()
+                self._wake.clear()
+
+    def _fade_out(self):
+        """Плавно уводит громкость канала в ноль и останавливает его.
+
+        Channel.fadeout() не годится: после затухания pygame запустил бы
+        кусок из очереди на полной громкости, а stop() очередь очищает.
+        """
+        for step in range(FADE_STEPS):
+            if self._closed:
+                break
+            self.channel.set_volume(1.0 - (step + 1) / FADE_STEPS)
+            time.sleep(FADE_SECONDS / FADE_STEPS)
+        self.channel.stop()
+        self.channel.set_volume(1.0)
+
+    def close(self):
+        """Останавливает музыку и поток"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self.channel is not None:
+            self.channel.stop()
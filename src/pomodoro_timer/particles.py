@@ -0,0 +1,466 @@
+"""
+Физика фоновых нот.
+
+SpatialHash - равномерная сетка (spatial hash) для широкой фазы поиска
+столкновений: вместо проверки всех пар нот проверяются только ноты из
+одной или соседних ячеек. Размер ячейки не меньше диаметра самой крупной
+ноты, поэтому пересекающиеся ноты всегда лежат в соседних ячейках.
+
+Столкновения разрешаются последовательно, пара за парой в порядке (i, j),
+как в полном переборе: толчок одной пары меняет позиции для следующих.
+Сдвинутая толчком нота тут же перекладывается в свою новую ячейку, а её
+новые соседи добавляются в очередь пар - так результат совпадает с
+полным перебором при любой плотности.
+
+Работа растёт с числом пересечений, и тысячи нот эта схема не тянет.
+Ноты одной единицы плотности (26 шт.) занимают около 11 тысяч px², то
+есть при x20 - почти 80% окна 500x560: ноты постоянно касаются соседей,
+а шаг физики занимает десятки миллисекунд. Тысяча нот не помещается в
+окно вовсе, и последовательное разрешение (его не векторизовать без
+потери совпадения с полным перебором) уходит за сотни миллисекунд.
+Поддерживаемый потолок - x10 (260 нот, 1-3 мс на шаг), и настройки
+выше не поднимаются (NOTE_DENSITY_STEPS).
+
+NoteField - хранилище нот в виде «структуры массивов»: координаты, скорости,
+размеры и цвета лежат в непрерывных массивах NumPy, а интегрирование,
+отталкивание от курсора, демпфирование, отскоки и поиск пересечений
+кандидатов считаются пакетно. Само разрешение столкновений остаётся
+циклом Python и в варианте с NumPy. Без NumPy используется эквивалентная
+реализация на списках Python; результаты обоих вариантов совпадают
+до бита.
+"""
+
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+SPEED_SCALE = 50.0  # Множитель скорости (px/сек)
+CURSOR_RADIUS = 30  # Радиус влияния курсора
+REPULSION_STRENGTH = 150.0  # Сила отталкивания от курсора
+# Коэффициент плавного возвращения к исходной скорости
+# За 6 секунд скорость вернется примерно на 95% к исходной
+RESTORE_FACTOR = 0.5  # Скорость восстановления (0.5 = медленно, 2.0 = быстро)
+
+# Соседние ячейки «вперёд»: вместе с собственной ячейкой каждая пара соседей
+# просматривается ровно один раз
+_FORWARD_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialHash:
+    """Равномерная сетка индексов нот по их координатам"""
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._keys = []  # Ячейка каждой точки
+
+    def _key(self, x, y):
+        inv = 1.0 / self.cell_size
+        return int(math.floor(x * inv)), int(math.floor(y * inv))
+
+    def rebuild(self, xs, ys):
+        """Раскладывает точки (xs[i], ys[i]) по ячейкам сетки"""
+        inv = 1.0 / self.cell_size
+        cells = {}
+        keys = []
+        for i in range(len(xs)):
+            key = (int(math.floor(xs[i] * inv)), int(math.floor(ys[i] * inv)))
+            keys.append(key)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [i]
+            else:
+                bucket.append(i)
+        self._cells = cells
+        self._keys = keys
+
+    def move(self, i, x, y):
+        """Перекладывает точку i, сдвинутую в (x, y), в её новую ячейку"""
+        key = self._key(x, y)
+        old = self._keys[i]
+        if key == old:
+            return
+        bucket = self._cells[old]
+        bucket.remove(i)
+        if not bucket:
+            del self._cells[old]
+        self._keys[i] = key
+        self._cells.setdefault(key, []).append(i)
+
+    def neighbours(self, i):
+        """Возвращает индексы точек из ячейки точки i и восьми соседних (включая i)"""
+        cx, cy = self._keys[i]
+        cells = self._cells
+        result = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                bucket = cells.get((cx + dx, cy + dy))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+    def pairs(self):
+        """Возвращает пары-кандидаты (i, j), i < j, из одной или соседних ячеек.
+
+        Пары отсортированы в порядке полного перебора по i и j.
+        """
+        cells = self._cells
+        result = []
+        for (cx, cy), bucket in cells.items():
+            n = len(bucket)
+            for a in range(n):
+                ia = bucket[a]
+                for b in range(a + 1, n):
+                    ib = bucket[b]
+                    result.append((ia, ib) if ia < ib else (ib, ia))
+            for dx, dy in _FORWARD_NEIGHBOURS:
+                other = cells.get((cx + dx, cy + dy))
+                if other is None:
+                    continue
+                for ia in bucket:
+                    for ib in other:
+                        result.append((ia, ib) if ia < ib else (ib, ia))
+        result.sort()
+        return result
+
+    def query(self, x, y, radius):
+        """Возвращает индексы точек из ячеек, которые пересекает круг (x, y, radius)"""
+        inv = 1.0 / self.cell_size
+        x0 = int(math.floor((x - radius) * inv))
+        x1 = int(math.floor((x + radius) * inv))
+        y0 = int(math.floor((y - radius) * inv))
+        y1 = int(math.floor((y + radius) * inv))
+        cells = self._cells
+        result = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+
+def _expand_ranges(src, lo, hi):
+    """Для каждого src[k] перечисляет все позиции из [lo[k], hi[k])"""
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if not total:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    starts = np.cumsum(counts) - counts
+    dst = np.arange(total, dtype=np.intp) - np.repeat(starts - lo, counts)
+    return np.repeat(src, counts), dst
+
+
+class ArraySpatialHash:
+    """Та же равномерная сетка, что и SpatialHash, но на массивах NumPy.
+
+    Точки сортируются по номеру ячейки, а содержимое ячеек ищется бинарным
+    поиском - без циклов Python по нотам.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._order = self._sorted = None
+
+    def rebuild(self, xs, ys):
+        inv = 1.0 / self.cell_size
+        cx = np.floor(xs * inv).astype(np.int64)
+        cy = np.floor(ys * inv).astype(np.int64)
+        # Сдвигаем номера ячеек так, чтобы у любой ячейки были соседи с
+        # неотрицательными номерами и ключи соседних строк не пересекались
+        self._origin = (int(cx.min()) - 1, int(cy.min()) - 1)
+        self._rows = int(cy.max()) - self._origin[1] + 2
+        keys = (cx - self._origin[0]) * self._rows + (cy - self._origin[1])
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted = keys[self._order]
+
+    def pairs(self):
+        """Возвращает массивы (a, b) пар-кандидатов, a < b, в порядке (a, b)"""
+        order, keys = self._order, self._sorted
+        positions = np.arange(len(keys), dtype=np.intp)
+        # Собственная ячейка: каждая точка с последующими в той же ячейке
+        hi = np.searchsorted(keys, keys, side='right')
+        chunks = [_expand_ranges(positions, positions + 1, hi)]
+        for dx, dy in _FORWARD_NEIGHBOURS:
+            target = keys + dx * self._rows + dy
+            lo = np.searchsorted(keys, target, side='left')
+            hi = np.searchsorted(keys, target, side='right')
+            chunks.append(_expand_ranges(positions, lo, hi))
+        src = order[np.concatenate([c[0] for c in chunks])]
+        dst = order[np.concatenate([c[1] for c in chunks])]
+        a = np.minimum(src, dst)
+        b = np.maximum(src, dst)
+        ordering = np.lexsort((b, a))
+        return a[ordering], b[ordering]
+
+    def query(self, x, y, radius):
+        """Возвращает массив индексов точек из ячеек, которые пересекает круг"""
+        inv = 1.0 / self.cell_size
+        x0 = int(math.floor((x - radius) * inv)) - self._origin[0]
+        x1 = int(math.floor((x + radius) * inv)) - self._origin[0]
+        y0 = max(0, int(math.floor((y - radius) * inv)) - self._origin[1])
+        y1 = min(self._rows - 1, int(math.floor((y + radius) * inv)) - self._origin[1])
+        if y0 > y1 or x1 < 0:
+            return np.empty(0, dtype=np.intp)
+        targets = np.array([cx * self._rows + cy for cx in range(max(0, x0), x1 + 1)
+                            for cy in range(y0, y1 + 1)], dtype=np.int64)
+        lo = np.searchsorted(self._sorted, targets, side='left')
+        hi = np.searchsorted(self._sorted, targets, side='right')
+        _, positions = _expand_ranges(np.zeros(len(targets), dtype=np.intp), lo, hi)
+        return self._order[positions]
+
+
+def _resolve_collisions(pairs, grid, x, y, vx, vy, radius):
+    """Разрешает столкновения пар нот в порядке полного перебора (списки изменяются на месте).
+
+    pairs - отсортированные пары (i, j), i < j, которые могут пересекаться
+    до первых толчков; grid - SpatialHash, построенный по тем же x, y.
+    Сдвинутые ноты перекладываются в сетке, а их новые соседи, до которых
+    полный перебор ещё не дошёл, добавляются в очередь.
+    """
+    queue = list(pairs)  # Отсортированный список - уже куча
+    queued = set(queue)
+    while queue:
+        i, j = heapq.heappop(queue)
+
+        # Расстояние между центрами
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        distance = math.sqrt(dx * dx + dy * dy)
+        min_distance = radius[i] + radius[j]
+
+        if distance < min_distance and distance > 0:
+            # Нормализация вектора
+            nx = dx / distance
+            ny = dy / distance
+
+            # Отталкивание - перемещаем ноты так, чтобы они не пересекались
+            overlap = min_distance - distance
+            x[i] -= nx * overlap * 0.5
+            y[i] -= ny * overlap * 0.5
+            x[j] += nx * overlap * 0.5
+            y[j] += ny * overlap * 0.5
+
+            # Новые соседи сдвинутых нот: пары после текущей в порядке перебора
+            current = (i, j)
+            for m in current:
+                grid.move(m, x[m], y[m])
+            for m in current:
+                for o in grid.neighbours(m):
+                    pair = (m, o) if m < o else (o, m)
+                    if pair > current and pair not in queued:
+                        queued.add(pair)
+                        heapq.heappush(queue, pair)
+
+            # Отражаем скорости, только если ноты сближаются
+            relative_vx = vx[j] - vx[i]
+            relative_vy = vy[j] - vy[i]
+            if relative_vx * nx + relative_vy * ny < 0:
+                # Сохраняем модули скоростей, меняем только направление
+                speed1 = math.sqrt(vx[i]**2 + vy[i]**2)
+                speed2 = math.sqrt(vx[j]**2 + vy[j]**2)
+
+                # Отражение: вычитаем двойную проекцию на нормаль
+                dot1 = vx[i] * nx + vy[i] * ny
+                vx[i] -= 2 * dot1 * nx
+                vy[i] -= 2 * dot1 * ny
+                dot2 = vx[j] * nx + vy[j] * ny
+                vx[j] -= 2 * dot2 * nx
+                vy[j] -= 2 * dot2 * ny
+
+                # Восстанавливаем исходные модули скоростей (на случай погрешностей)
+                new_speed1 = math.sqrt(vx[i]**2 + vy[i]**2)
+                new_speed2 = math.sqrt(vx[j]**2 + vy[j]**2)
+                if new_speed1 > 0:
+                    vx[i] = vx[i] * speed1 / new_speed1
+                    vy[i] = vy[i] * speed1 / new_speed1
+                if new_speed2 > 0:
+                    vx[j] = vx[j] * speed2 / new_speed2
+                    vy[j] = vy[j] * speed2 / new_speed2
+
+
+class NoteField:
+    """Набор фоновых нот в виде структуры массивов.
+
+    Ноты добавляются через add(), после чего pack() переводит их в массивы
+    NumPy (если он доступен и use_numpy не запрещён). cell_size - размер
+    ячейки сетки, не меньше диаметра самой крупной ноты.
+    """
+
+    def __init__(self, width, height, palette, cell_size, use_numpy=None):
+        self.width = width
+        self.height = height
+        self.palette = list(palette)
+        self.use_numpy = np is not None if use_numpy is None else (use_numpy and np is not None)
+        self._grid = (ArraySpatialHash if self.use_numpy else SpatialHash)(cell_size)
+        # Сетка для разрешения столкновений: ноты перекладываются по мере толчков
+        self._moves = self._grid if not self.use_numpy else SpatialHash(cell_size)
+        self.x, self.y = [], []
+        self.vx, self.vy = [], []
+        self.ovx, self.ovy = [], []  # Исходные скорости, к которым возвращаются ноты
+        self.size, self.radius = [], []
+        self.color = []  # Индексы в palette
+
+    def __len__(self):
+        return len(self.size)
+
+    def add(self, x, y, size, color_index, vx, vy):
+        """Добавляет ноту (до вызова pack())"""
+        self.x.append(x)
+        self.y.append(y)
+        self.vx.append(vx)
+        self.vy.append(vy)
+        self.ovx.append(vx)
+        self.ovy.append(vy)
+        self.size.append(size)
+        self.radius.append(size * 0.5)
+        self.color.append(color_index)
+
+    def pack(self):
+        """Переводит накопленные списки в непрерывные массивы NumPy"""
+        if not self.use_numpy:
+            return
+        for name in ('x', 'y', 'vx', 'vy', 'ovx', 'ovy', 'size', 'radius'):
+            setattr(self, name, np.array(getattr(self, name), dtype=np.float64))
+        self.color = np.array(self.color, dtype=np.intp)
+
+    def notes(self):
+        """Итератор (x, y, size, color) для отрисовки"""
+        colors = self.palette
+        as_list = (lambda a: a.tolist()) if self.use_numpy else (lambda a: a)
+        for x, y, size, color in zip(as_list(self.x), as_list(self.y), as_list(self.size), as_list(self.color)):
+            yield x, y, size, colors[color]
+
+    def step(self, dt, mouse_x, mouse_y):
+        """Продвигает симуляцию на dt секунд"""
+        if not len(self):
+            return
+        if self.use_numpy:
+            self._step_numpy(dt, mouse_x, mouse_y)
+        else:
+            self._step_python(dt, mouse_x, mouse_y)
+
+    def _step_python(self, dt, mouse_x, mouse_y):
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        ovx, ovy, radius = self.ovx, self.ovy, self.radius
+        width, height = self.width, self.height
+        n = len(x)
+
+        # Обновляем позиции
+        for i in range(n):
+            x[i] += vx[i] * SPEED_SCALE * dt
+            y[i] += vy[i] * SPEED_SCALE * dt
+
+        # Отталкивание от курсора: только ноты из ячеек вокруг курсора
+        self._grid.rebuild(x, y)
+        for i in self._grid.query(mouse_x, mouse_y, CURSOR_RADIUS):
+            dx_cursor = x[i] - mouse_x
+            dy_cursor = y[i] - mouse_y
+            distance_cursor = math.sqrt(dx_cursor * dx_cursor + dy_cursor * dy_cursor)
+            if distance_cursor < CURSOR_RADIUS and distance_cursor > 0:
+                # Сила отталкивания обратно пропорциональна расстоянию
+                force = REPULSION_STRENGTH * (1 - distance_cursor / CURSOR_RADIUS)
+                vx[i] += dx_cursor / distance_cursor * force * dt
+                vy[i] += dy_cursor / distance_cursor * force * dt
+
+        # Плавное возвращение к исходной скорости и отскок от краёв окна
+        damping = 1.0 - math.exp(-RESTORE_FACTOR * dt)
+        for i in range(n):
+            vx[i] += (ovx[i] - vx[i]) * damping
+            vy[i] += (ovy[i] - vy[i]) * damping
+
+            r = radius[i]
+            if x[i] - r < 0:
+                x[i] = r
+                vx[i] = abs(vx[i])
+                ovx[i] = abs(ovx[i])
+            elif x[i] + r > width:
+                x[i] = width - r
+                vx[i] = -abs(vx[i])
+                ovx[i] = -abs(ovx[i])
+
+            if y[i] - r < 0:
+                y[i] = r
+                vy[i] = abs(vy[i])
+                ovy[i] = abs(ovy[i])
+            elif y[i] + r > height:
+                y[i] = height - r
+                vy[i] = -abs(vy[i])
+                ovy[i] = -abs(ovy[i])
+
+        # Столкновения между нотами
+        self._grid.rebuild(x, y)
+        _resolve_collisions(self._grid.pairs(), self._grid, x, y, vx, vy, radius)
+
+    def _step_numpy(self, dt, mouse_x, mouse_y):
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        ovx, ovy, radius = self.ovx, self.ovy, self.radius
+
+        # Обновляем позиции
+        x += vx * SPEED_SCALE * dt
+        y += vy * SPEED_SCALE * dt
+
+        # Отталкивание от курсора: только ноты из ячеек вокруг курсора
+        self._grid.rebuild(x, y)
+        near = self._grid.query(mouse_x, mouse_y, CURSOR_RADIUS)
+        if len(near):
+            dx_cursor = x[near] - mouse_x
+            dy_cursor = y[near] - mouse_y
+            distance_cursor = np.sqrt(dx_cursor * dx_cursor + dy_cursor * dy_cursor)
+            hit = (distance_cursor < CURSOR_RADIUS) & (distance_cursor > 0)
+            if hit.any():
+                near, dx_cursor, dy_cursor = near[hit], dx_cursor[hit], dy_cursor[hit]
+                distance_cursor = distance_cursor[hit]
+                force = REPULSION_STRENGTH * (1 - distance_cursor / CURSOR_RADIUS)
+                vx[near] += dx_cursor / distance_cursor * force * dt
+                vy[near] += dy_cursor / distance_cursor * force * dt
+
+        # Плавное возвращение к исходной скорости
+        damping = 1.0 - math.exp(-RESTORE_FACTOR * dt)
+        vx += (ovx - vx) * damping
+        vy += (ovy - vy) * damping
+
+        # Отскок от краёв окна
+        left = x - radius < 0
+        right = ~left & (x + radius > self.width)
+        top = y - radius < 0
+        bottom = ~top & (y + radius > self.height)
+        x[left] = radius[left]
+        x[right] = self.width - radius[right]
+        y[top] = radius[top]
+        y[bottom] = self.height - radius[bottom]
+        for mask, v, ov, sign in ((left, vx, ovx, 1), (right, vx, ovx, -1),
+                                  (top, vy, ovy, 1), (bottom, vy, ovy, -1)):
+            if mask.any():
+                v[mask] = sign * np.abs(v[mask])
+                ov[mask] = sign * np.abs(ov[mask])
+
+        # Столкновения: широкая фаза по сетке, проверка пересечения кандидатов
+        # пакетом, последовательное разрешение - только там, где это нужно
+        self._grid.rebuild(x, y)
+        a, b = self._grid.pairs()
+        if not len(a):
+            return
+        dx = x[b] - x[a]
+        dy = y[b] - y[a]
+        distance = np.sqrt(dx * dx + dy * dy)
+        overlapping = (distance < radius[a] + radius[b]) & (distance > 0)
+        if not overlapping.any():
+            return
+
+        # Дальше важен порядок: пары обрабатываются последовательно, как в
+        # исходном алгоритме; в очередь сразу попадают только пересекающиеся,
+        # остальные - когда толчок сдвинет одну из нот
+        xs, ys, vxs, vys = x.tolist(), y.tolist(), vx.tolist(), vy.tolist()
+        self._moves.rebuild(xs, ys)
+        pairs = zip(a[overlapping].tolist(), b[overlapping].tolist())
+        _resolve_collisions(pairs, self._moves, xs, ys, vxs, vys, radius.tolist())
+        x[:] = xs
+        y[:] = ys
+        vx[:] = vxs
+        vy[:] = vys
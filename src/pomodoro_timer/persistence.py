@@ -0,0 +1,172 @@
+"""
+Отложенная запись настроек и слежение за их файлом.
+
+Каждый щелчок по +/- в панели настроек меняет значение, но писать файл на
+каждый щелчок в потоке отрисовки нельзя: на медленном (например, сетевом)
+домашнем каталоге это пропущенные кадры. DeferredWriter принимает готовый
+снимок данных, откладывает запись на SAVE_DELAY секунд (серия быстрых
+изменений сливается в одну запись) и пишет файл в фоновом потоке: сначала
+во временный файл рядом, затем os.replace() - так что убитый посреди
+записи процесс оставляет либо старый, либо новый файл, но не обрезанный.
+flush() дописывает отложенное синхронно - его вызывают при выходе.
+
+FileWatcher замечает, что файл переписали снаружи (например, система
+управления конфигурацией): не чаще раза в POLL_SECONDS он сравнивает
+os.stat() - время изменения, размер и inode - с запомненным. Сам файл
+читается, только если подпись изменилась. Свою запись DeferredWriter
+делает внутри FileWatcher.own_write(): на это время проверка
+пропускается, а после записи подпись запоминается, так что своя запись
+не принимается за внешнюю.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+import threading
+import time
+
+SAVE_DELAY = 0.5  # Пауза после последнего изменения перед записью, с
+POLL_SECONDS = 1.0  # Как часто проверять файл настроек на внешние изменения
+
+
+def write_json_atomic(path, data):
+    """Записывает data в path через временный файл и os.replace()"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DeferredWriter:
+    """Пишет последний переданный снимок в JSON-файл из фонового потока"""
+
+    def __init__(self, path, delay=SAVE_DELAY, label="Настройки", watcher=None):
+        self.path = path
+        self.delay = delay
+        self.label = label
+        self.watcher = watcher  # FileWatcher того же файла, которому сообщаем о своей записи
+        self._pending = None  # Снимок, ещё не записанный на диск
+        self._due = 0.0  # Когда его записать (time.monotonic)
+        self._lock = threading.Lock()  # Защищает _pending и _due
+        self._write_lock = threading.Lock()  # Одна запись файла за раз
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def schedule(self, data):
+        """Запоминает снимок и откладывает запись; не блокирует"""
+        with self._lock:
+            self._pending = data
+            self._due = time.monotonic() + self.delay
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='settings-writer', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            data, self._pending = self._pending, None
+        return data
+
+    def _write(self, data):
+        try:
+            if self.watcher is None:
+                write_json_atomic(self.path, data)
+            else:
+                with self.watcher.own_write():
+                    write_json_atomic(self.path, data)
+            print(f"✓ {self.label} сохранены в {self.path}")
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️  Ошибка сохранения: {e}")
+
+    def cancel(self):
+        """Забывает отложенный снимок (например, файл переписали снаружи)"""
+        self._take()
+
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                pending = self._pending is not None
+                wait = self._due - time.monotonic() if pending else None
+            if pending and wait <= 0:
+                with self._write_lock:
+                    data = self._take()
+                    if data is not None:
+                        self._write(data)
+                continue
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def flush(self):
+        """Синхронно записывает отложенный снимок, если он есть"""
+        with self._write_lock:
+            data = self._take()
+            if data is not None:
+                self._write(data)
+
+    def close(self):
+        """Дописывает отложенное и останавливает поток"""
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+def file_signature(path):
+    """(mtime_ns, размер, inode) файла или None, если его нет"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class FileWatcher:
+    """Дешёвая проверка «изменился ли файл» по os.stat() с ограничением частоты"""
+
+    def __init__(self, path, interval=POLL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._signature = file_signature(path)
+        self._next_check = time.monotonic() + interval
+        # Защищает _signature: своя запись идёт из потока записи, а
+        # changed() вызывается из главного
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def own_write(self):
+        """Своя запись файла: пока она идёт, changed() ничего не сообщает,
+        а после неё новая подпись запоминается как известная"""
+        with self._lock:
+            try:
+                yield
+            finally:
+                self._signature = file_signature(self.path)
+
+    def changed(self):
+        """Изменился ли файл с прошлой проверки; stat() не чаще раза в interval"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        # Главный поток не ждёт чужую запись: проверим на следующей итерации
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = now + self.interval
+            signature = file_signature(self.path)
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            return signature is not None  # Удалённый файл не перечитываем
+        finally:
+            self._lock.release()
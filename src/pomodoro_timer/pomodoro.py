@@ -1,64 +1,66 @@
-import pygame
-import time
-import sys
+import argparse
+import json
+import math
 import os
-import io
-import wave
-import struct
-from pygame import mixer
+import random
+import sys
+import time
 
-# Инициализация pygame
-pygame.init()
-mixer.init()
+import pygame
+from pygame import gfxdraw, mixer
+
+from .assets import AssetManager
+from .audio import AUDIO_DEFAULTS, calibrate, configure_mixer, read_audio_settings, validate_audio_settings
+from .core import PHASE_ABORTED, PHASE_COMPLETE, WORK, TimerCore
+from .metronome import (MAX_BPM, MAX_RAMP_BPM, MIN_BPM, SIGNATURES, SUBDIVISIONS,
+                        Metronome, MetronomePattern)
+from .fonts import FontCache
+from .history import PHASES, HistoryLog, HistoryReader
+from .music import MusicPlayer
+from .particles import NoteField
+from .persistence import DeferredWriter, FileWatcher
+from .rendering import DirtyTracker, GlyphAtlas, LayerCache, NoteSpriteAtlas, ProgressRing, TextCache
+from .scheduler import ACTIVE, FrameScheduler
+
+# Импорт модуля ничего не инициализирует: pygame, окно и звук поднимает
+# create_app()
+
+SETTINGS_FILE = os.path.expanduser("~/.pomodoro_timer_settings.json")
+
+# Ресурсы ищутся независимо от текущего каталога и декодируются лениво
+assets = AssetManager()
+# Пути к системным шрифтам ищутся один раз и хранятся в кэше (см. --rebuild-font-cache)
+fonts = FontCache()
 
-# Загрузка и установка иконки окна (ДО создания окна!)
 def load_icon():
     """Загружает иконку приложения для окна"""
-    icon_paths = []
-
-    # Проверяем пути относительно исполняемого файла (для PyInstaller)
-    if getattr(sys, 'frozen', False):
-        # Запущено как собранное приложение
-        base_path = sys._MEIPASS
-        icon_paths.append(os.path.join(base_path, "resources", "icon.png"))
-    else:
-        # Запущено из исходников - проверяем несколько возможных путей
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(script_dir))
-
-        icon_paths.extend([
-            os.path.join(project_root, "resources", "icon.png"),
-            os.path.join(script_dir, "..", "..", "resources", "icon.png"),
-            os.path.join("resources", "icon.png"),
-        ])
-
-    for path in icon_paths:
-        if os.path.exists(path):
-            try:
-                # Загружаем PNG (icns pygame не поддерживает напрямую)
-                if path.endswith('.png'):
-                    icon = pygame.image.load(path)
-                    # Конвертируем в формат, подходящий для иконки (32x32 или 64x64)
-                    icon = pygame.transform.smoothscale(icon, (64, 64))
-                    return icon
-            except Exception as e:
-                print(f"Не удалось загрузить иконку из {path}: {e}")
-                continue
-
-    # Если иконка не найдена, выводим предупреждение
-    if not getattr(sys, 'frozen', False):
-        print("⚠️  Иконка не найдена. Запустите scripts/create_icon.py для создания иконки.")
-    return None
-
-# Устанавливаем иконку ПЕРЕД созданием окна (важно!)
-app_icon = load_icon()
-if app_icon:
-    pygame.display.set_icon(app_icon)
+    # Загружаем PNG (icns pygame не поддерживает напрямую)
+    icon = assets.image("icon.png")
+    if icon is None:
+        # Если иконка не найдена, выводим предупреждение
+        if not getattr(sys, 'frozen', False):
+            print("⚠️  Иконка не найдена. Запустите scripts/create_icon.py для создания иконки.")
+        return None
+    # Конвертируем в формат, подходящий для иконки (32x32 или 64x64)
+    return pygame.transform.smoothscale(icon, (64, 64))
 
 # Константы
 WORK_TIME = 25 * 60  # 25 минут в секундах
 SHORT_BREAK = 5 * 60  # 5 минут в секундах
 LONG_BREAK = 15 * 60  # 15 минут в секундах
+# Допустимые длительности фаз в настройках, минуты
+WORK_TIME_RANGE = (1, 60)
+SHORT_BREAK_RANGE = (1, 30)
+LONG_BREAK_RANGE = (5, 30)
+
+# Фоновые ноты: базовое количество и допустимые множители плотности
+BG_LARGE_NOTES = 8
+BG_SMALL_NOTES = 18
+BG_NOTE_MAX_SIZE = 42  # Максимальный диаметр ноты - размер ячейки сетки столкновений
+# x10 (260 нот) - поддерживаемый потолок: выше ноты заполняют окно почти
+# сплошь, и шаг физики уходит за десятки миллисекунд (x20 - 25-35 мс,
+# 1000 нот - сотни мс); тысячи нот в окно не помещаются (см. particles)
+NOTE_DENSITY_STEPS = (0, 0.5, 1, 2, 5, 10)
 
 # Современная цветовая палитра - минимализм
 BG_COLOR = (250, 250, 252)  # Светло-серый фон
@@ -74,134 +76,162 @@ SUCCESS_COLOR = (76, 175, 80)  # Зеленый
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
-# Создание окна
+# Размеры окна
 WIDTH, HEIGHT = 500, 560
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pomodoro Timer")
-
-# Загрузка звуков
-try:
-    work_alarm_sound = mixer.Sound(os.path.join("resources", "sounds", "alarm.wav"))
-except:
-    print("Файл alarm.wav не найден. Создаем заглушку.")
-    work_alarm_sound = None
-
-try:
-    break_alarm_sound = mixer.Sound(os.path.join("resources", "sounds", "break_alarm.wav"))
-except:
-    print("Файл break_alarm.wav не найден. Используем стандартный звук.")
-    break_alarm_sound = None
-
-# Создание звука метронома в памяти (короткий «тик» ~80мс)
-def create_tick_sound():
-    try:
-        sample_rate = 44100
-        duration = 0.08  # короткий щелчок (~80 мс)
-        num_samples = int(sample_rate * duration)
-
-        # Формируем WAV в памяти
-        buffer = io.BytesIO()
-        with wave.open(buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)          # моно
-            wav_file.setsampwidth(2)          # 16-бит PCM
-            wav_file.setframerate(sample_rate)
-
-            import random
-            frames = bytearray()
-
-            # Параметры составляющих клика
-            # Короткая высокочастотная атака (похожа на механический щелчок)
-            transient_freq = 3500.0
-            transient_tau = 0.004   # 4 мс экспон. затухание
-            # Низкая «деревянная» составляющая
-            body_freq = 650.0
-            body_tau = 0.018        # 18 мс
-            # Шумовая составляющая (узкий щелчок с затуханием)
-            noise_tau = 0.010       # 10 мс
-
-            for i in range(num_samples):
-                t = i / sample_rate
-
-                # Экспоненциальные огибающие
-                env_transient = math.exp(-t / transient_tau)
-                env_body = math.exp(-t / body_tau)
-                env_noise = math.exp(-t / noise_tau)
-
-                # Компоненты сигнала
-                transient = math.sin(2 * math.pi * transient_freq * t) * env_transient
-                body = math.sin(2 * math.pi * body_freq * t) * env_body
-                noise = (random.random() * 2 - 1) * env_noise
-
-                # Смешиваем компоненты для «часового тика»
-                sample = 0.55 * transient + 0.25 * body + 0.20 * noise
-
-                # Ограничение и упаковка
-                val = max(-1.0, min(1.0, sample * 0.7))
-                frames += struct.pack('<h', int(val * 32767))
-
-            wav_file.writeframes(frames)
-
-        buffer.seek(0)
-        snd = mixer.Sound(file=buffer)
-        snd.set_volume(0.22)  # мягкий, но читаемый уровень
-        return snd
-    except Exception:
-        return None
+RING_RADIUS = 120  # Радиус дуги прогресса
+# Обновлять только изменившиеся области экрана вместо полного flip()
+DIRTY_RECT_RENDERING = True
+
+# Звуки сигналов нужны только к концу фазы: они загружаются в фоне после
+# появления окна (или при первом обращении)
+ALARM_SOUNDS = (("sounds", "alarm.wav"), ("sounds", "break_alarm.wav"))
 
-# math понадобится для генерации тика
-import math
-tick_sound = create_tick_sound()
 
 class Settings:
     def __init__(self):
-        self.config_file = os.path.expanduser("~/.pomodoro_timer_settings.json")
+        self.config_file = SETTINGS_FILE
+        # Файл пишется в фоне, с задержкой, сливающей серию изменений в одну запись;
+        # внешние правки файла подхватываются на лету (свои записи не в счёт)
+        self.watcher = FileWatcher(self.config_file)
+        self.writer = DeferredWriter(self.config_file, watcher=self.watcher)
 
         # Значения по умолчанию
         self.work_time = 25  # минуты
         self.short_break = 5  # минуты
         self.long_break = 15  # минуты
         self.metronome_enabled = True
-        self.metronome_interval = 1.0  # секунды между тиками
+        self.metronome_bpm = 60  # удары в минуту
+        self.metronome_signature = (4, 4)  # размер такта
+        self.metronome_accent = True  # выделять сильную долю
+        self.metronome_subdivision = 1  # сколько тиков на долю
+        self.metronome_ramp = 0  # изменение темпа к концу работы, уд/мин
+        self.music_enabled = False  # фоновая музыка во время работы (клавиша M)
+        self.note_density = 1  # множитель количества фоновых нот
+        # Параметры аудиовыхода: частота, каналы, размер буфера (см. --calibrate-audio)
+        self.audio_frequency = AUDIO_DEFAULTS['audio_frequency']
+        self.audio_channels = AUDIO_DEFAULTS['audio_channels']
+        self.audio_buffer = AUDIO_DEFAULTS['audio_buffer']
         self.show_settings = False
-        self.font = pygame.font.SysFont('Arial', 24)
-        self.small_font = pygame.font.SysFont('Arial', 18)
+        self.font = fonts.font('Arial', 24)
+        self.small_font = fonts.font('Arial', 18)
+        # Надписи панели рендерятся один раз на каждое значение
+        self.text_cache = TextCache()
+        # Раскладка панели считается один раз, а сама панель вместе с
+        # затемнением собирается в одну поверхность и обновляется только
+        # при изменении значений
+        self.buttons = self._layout()
+        self._overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        self._overlay_state = None
 
         # Загружаем настройки из файла
         self.load_settings()
 
     def load_settings(self):
         """Загружает настройки из файла"""
+        data = self._read_file()
+        if data is not None:
+            self._apply(data)
+            print(f"✓ Настройки загружены из {self.config_file}")
+
+    def _read_file(self):
+        """Содержимое файла настроек или None, если его нет или он повреждён"""
         try:
             if os.path.exists(self.config_file):
-                import json
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.work_time = data.get('work_time', 25)
-                    self.short_break = data.get('short_break', 5)
-                    self.long_break = data.get('long_break', 15)
-                    self.metronome_enabled = data.get('metronome_enabled', True)
-                    self.metronome_interval = data.get('metronome_interval', 1.0)
-                    print(f"✓ Настройки загружены из {self.config_file}")
+                if isinstance(data, dict):
+                    return data
+                print(f"⚠️  Ошибка загрузки настроек: в {self.config_file} не JSON-объект")
         except Exception as e:
             print(f"⚠️  Ошибка загрузки настроек: {e}")
             # Используем значения по умолчанию
+        return None
+
+    def _apply(self, data):
+        """Переносит в настройки допустимые значения из data; остальные не меняются"""
+        def minutes(key, bounds):
+            value = data.get(key, getattr(self, key))
+            if isinstance(value, int) and not isinstance(value, bool) and bounds[0] <= value <= bounds[1]:
+                return value
+            return getattr(self, key)
+
+        def flag(key):
+            # Только настоящие true/false: bool("false") - это True
+            value = data.get(key, getattr(self, key))
+            return value if isinstance(value, bool) else getattr(self, key)
+
+        self.work_time = minutes('work_time', WORK_TIME_RANGE)
+        self.short_break = minutes('short_break', SHORT_BREAK_RANGE)
+        self.long_break = minutes('long_break', LONG_BREAK_RANGE)
+        self.metronome_enabled = flag('metronome_enabled')
+        bpm = data.get('metronome_bpm')
+        interval = data.get('metronome_interval')
+        if bpm is None and isinstance(interval, (int, float)) and interval > 0:
+            # Старые настройки хранили период тика в секундах
+            bpm = int(round(60 / interval))
+        if isinstance(bpm, int):
+            self.metronome_bpm = min(MAX_BPM, max(MIN_BPM, bpm))
+        signature = data.get('metronome_signature', self.metronome_signature)
+        if isinstance(signature, (list, tuple)) and tuple(signature) in SIGNATURES:
+            self.metronome_signature = tuple(signature)
+        self.metronome_accent = flag('metronome_accent')
+        subdivision = data.get('metronome_subdivision', self.metronome_subdivision)
+        if subdivision in SUBDIVISIONS:
+            self.metronome_subdivision = subdivision
+        ramp = data.get('metronome_ramp', self.metronome_ramp)
+        if isinstance(ramp, int):
+            self.metronome_ramp = min(MAX_RAMP_BPM, max(-MAX_RAMP_BPM, ramp))
+        self.music_enabled = flag('music_enabled')
+        density = data.get('note_density', self.note_density)
+        if density in NOTE_DENSITY_STEPS:
+            self.note_density = density
+        elif isinstance(density, (int, float)) and density > NOTE_DENSITY_STEPS[-1]:
+            self.note_density = NOTE_DENSITY_STEPS[-1]  # Значение из прежних версий
+        # Микшер перенастраивается только при следующем запуске
+        for key, value in validate_audio_settings(data).items():
+            if key in data:
+                setattr(self, key, value)
+
+    def reload_if_changed(self):
+        """Перечитывает файл, если его переписали снаружи; True, если настройки обновлены.
+
+        Вызывается каждую итерацию главного цикла, но сам файл проверяется
+        через os.stat() не чаще раза в секунду и читается только при изменении.
+        """
+        if not self.watcher.changed():
+            return False
+        data = self._read_file()
+        if data is None:
+            return False
+        # Внешняя правка главнее ещё не записанной своей
+        self.writer.cancel()
+        self._apply(data)
+        print(f"✓ Настройки перечитаны из {self.config_file}")
+        return True
 
     def save_settings(self):
-        """Сохраняет настройки в файл"""
-        try:
-            import json
-            data = {
-                'work_time': self.work_time,
-                'short_break': self.short_break,
-                'long_break': self.long_break,
-                'metronome_enabled': self.metronome_enabled,
-                'metronome_interval': self.metronome_interval,
-            }
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"✓ Настройки сохранены в {self.config_file}")
-        except Exception as e:
-            print(f"⚠️  Ошибка сохранения настроек: {e}")
+        """Ставит сохранение настроек в очередь; файл запишется в фоне"""
+        data = {
+            'work_time': self.work_time,
+            'short_break': self.short_break,
+            'long_break': self.long_break,
+            'metronome_enabled': self.metronome_enabled,
+            'metronome_bpm': self.metronome_bpm,
+            'metronome_signature': list(self.metronome_signature),
+            'metronome_accent': self.metronome_accent,
+            'metronome_subdivision': self.metronome_subdivision,
+            'metronome_ramp': self.metronome_ramp,
+            'music_enabled': self.music_enabled,
+            'note_density': self.note_density,
+            'audio_frequency': self.audio_frequency,
+            'audio_channels': self.audio_channels,
+            'audio_buffer': self.audio_buffer,
+        }
+        self.writer.schedule(data)
+
+    def flush_settings(self):
+        """Дописывает отложенные изменения на диск (при выходе)"""
+        self.writer.close()
 
     def get_work_time_seconds(self):
         return self.work_time * 60
@@ -212,113 +242,130 @@ class Settings:
     def get_long_break_seconds(self):
         return self.long_break * 60
 
+    def metronome_pattern(self):
+        """Текущий рисунок метронома"""
+        return MetronomePattern(self.metronome_bpm, self.metronome_signature,
+                                self.metronome_accent, self.metronome_subdivision,
+                                self.metronome_ramp)
+
+    def _layout(self):
+        """Вычисляет расположение окна настроек и rect'ы его кнопок (один раз)"""
+        # Окно настроек (современный дизайн) — увеличено для видимости метронома
+        self.settings_rect = settings_rect = pygame.Rect(40, 20, WIDTH - 80, HEIGHT - 40)
+
+        # Строки с настройками: подпись слева, кнопки справа
+        rows = {}
+        y_offset = settings_rect.y + 70
+        for name, step in (('work', 45), ('short', 45), ('long', 45), ('metro', 40), ('tempo', 40),
+                           ('signature', 40), ('subdivision', 40), ('ramp', 40), ('density', 0)):
+            rows[name] = y_offset
+            y_offset += step
+        self._rows = rows
+
+        buttons = {}
+        for name in ('work', 'short', 'long', 'tempo', 'signature', 'subdivision', 'ramp', 'density'):
+            buttons[name + '_minus'] = pygame.Rect(settings_rect.right - 120, rows[name] - 5, 45, 35)
+            buttons[name + '_plus'] = pygame.Rect(settings_rect.right - 65, rows[name] - 5, 45, 35)
+        buttons['metro_toggle'] = pygame.Rect(settings_rect.right - 200, rows['metro'] - 5, 80, 35)
+        buttons['accent_toggle'] = pygame.Rect(settings_rect.right - 110, rows['metro'] - 5, 90, 35)
+        buttons['close_button'] = pygame.Rect(settings_rect.centerx - 60, settings_rect.bottom - 60, 120, 45)
+        return buttons
+
+    def panel_state(self):
+        """Значения, от которых зависит картинка панели настроек"""
+        return (self.work_time, self.short_break, self.long_break,
+                self.metronome_enabled, self.metronome_pattern(), self.note_density)
+
     def draw_settings(self, screen):
+        """Рисует панель настроек одним блитом заранее собранного оверлея"""
         if not self.show_settings:
             return None
 
+        state = self.panel_state()
+        if state != self._overlay_state:
+            self._render_overlay(self._overlay)
+            self._overlay_state = state
+        screen.blit(self._overlay, (0, 0))
+        return self.buttons
+
+    def _render_overlay(self, surface):
+        """Собирает полупрозрачный оверлей вместе с окном настроек"""
         # Полупрозрачный фон-оверлей
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
+        surface.fill((0, 0, 0, 180))
 
-        # Окно настроек (современный дизайн) — увеличено для видимости метронома
-        settings_rect = pygame.Rect(40, 30, WIDTH - 80, HEIGHT - 60)
+        settings_rect = self.settings_rect
+        buttons = self.buttons
+        rows = self._rows
+        label_x = settings_rect.x + 40
 
         # Тень окна
         shadow_rect = settings_rect.copy()
         shadow_rect.x += 4
         shadow_rect.y += 4
-        pygame.draw.rect(screen, (0, 0, 0, 50), shadow_rect, border_radius=20)
+        pygame.draw.rect(surface, (0, 0, 0), shadow_rect, border_radius=20)
 
         # Основное окно
-        pygame.draw.rect(screen, WHITE, settings_rect, border_radius=20)
+        pygame.draw.rect(surface, WHITE, settings_rect, border_radius=20)
 
         # Заголовок
-        title = self.font.render("Настройки", True, TEXT_COLOR)
-        screen.blit(title, (settings_rect.centerx - title.get_width()//2, settings_rect.y + 25))
-
-        y_offset = settings_rect.y + 80
+        title = self.text_cache.render(self.font, "Настройки", TEXT_COLOR)
+        surface.blit(title, (settings_rect.centerx - title.get_width()//2, settings_rect.y + 25))
 
         # Настройка времени работы
-        work_text = self.small_font.render(f"Работа: {self.work_time} мин", True, TEXT_COLOR)
-        screen.blit(work_text, (settings_rect.x + 40, y_offset))
-
-        # Кнопки для времени работы
-        work_minus = pygame.Rect(settings_rect.right - 120, y_offset - 5, 45, 35)
-        work_plus = pygame.Rect(settings_rect.right - 65, y_offset - 5, 45, 35)
-        self.draw_setting_button(screen, work_minus, "-", WORK_COLOR)
-        self.draw_setting_button(screen, work_plus, "+", WORK_COLOR)
-
-        y_offset += 60
+        work_text = self.text_cache.render(self.small_font, f"Работа: {self.work_time} мин", TEXT_COLOR)
+        surface.blit(work_text, (label_x, rows['work']))
+        self.draw_setting_button(surface, buttons['work_minus'], "-", WORK_COLOR)
+        self.draw_setting_button(surface, buttons['work_plus'], "+", WORK_COLOR)
 
         # Настройка короткого перерыва
-        short_text = self.small_font.render(f"Короткий перерыв: {self.short_break} мин", True, TEXT_COLOR)
-        screen.blit(short_text, (settings_rect.x + 40, y_offset))
-
-        # Кнопки для короткого перерыва
-        short_minus = pygame.Rect(settings_rect.right - 120, y_offset - 5, 45, 35)
-        short_plus = pygame.Rect(settings_rect.right - 65, y_offset - 5, 45, 35)
-        self.draw_setting_button(screen, short_minus, "-", BREAK_COLOR)
-        self.draw_setting_button(screen, short_plus, "+", BREAK_COLOR)
-
-        y_offset += 60
+        short_text = self.text_cache.render(self.small_font, f"Короткий перерыв: {self.short_break} мин", TEXT_COLOR)
+        surface.blit(short_text, (label_x, rows['short']))
+        self.draw_setting_button(surface, buttons['short_minus'], "-", BREAK_COLOR)
+        self.draw_setting_button(surface, buttons['short_plus'], "+", BREAK_COLOR)
 
         # Настройка длинного перерыва
-        long_text = self.small_font.render(f"Длинный перерыв: {self.long_break} мин", True, TEXT_COLOR)
-        screen.blit(long_text, (settings_rect.x + 40, y_offset))
-
-        # Кнопки для длинного перерыва
-        long_minus = pygame.Rect(settings_rect.right - 120, y_offset - 5, 45, 35)
-        long_plus = pygame.Rect(settings_rect.right - 65, y_offset - 5, 45, 35)
-        self.draw_setting_button(screen, long_minus, "-", PRIMARY_COLOR)
-        self.draw_setting_button(screen, long_plus, "+", PRIMARY_COLOR)
-
-        y_offset += 60
+        long_text = self.text_cache.render(self.small_font, f"Длинный перерыв: {self.long_break} мин", TEXT_COLOR)
+        surface.blit(long_text, (label_x, rows['long']))
+        self.draw_setting_button(surface, buttons['long_minus'], "-", PRIMARY_COLOR)
+        self.draw_setting_button(surface, buttons['long_plus'], "+", PRIMARY_COLOR)
 
         # Настройки метронома
         metro_status = "ВКЛ" if self.metronome_enabled else "ВЫКЛ"
-        metro_text = self.small_font.render(f"Метроном: {metro_status}", True, TEXT_COLOR)
-        screen.blit(metro_text, (settings_rect.x + 40, y_offset))
-
-        # Кнопка переключателя метронома
-        metro_toggle = pygame.Rect(settings_rect.right - 200, y_offset - 5, 80, 35)
-        self.draw_setting_button(screen, metro_toggle, metro_status, PRIMARY_COLOR if self.metronome_enabled else BUTTON_SHADOW)
-
-        # Период тика (в секундах)
-        y_offset += 45
-        interval_display = f"Период тика: {self.metronome_interval:.1f} c"
-        interval_text = self.small_font.render(interval_display, True, TEXT_COLOR)
-        screen.blit(interval_text, (settings_rect.x + 40, y_offset))
-
-        interval_minus = pygame.Rect(settings_rect.right - 120, y_offset - 5, 45, 35)
-        interval_plus = pygame.Rect(settings_rect.right - 65, y_offset - 5, 45, 35)
-        self.draw_setting_button(screen, interval_minus, "-", PRIMARY_COLOR)
-        self.draw_setting_button(screen, interval_plus, "+", PRIMARY_COLOR)
+        metro_text = self.text_cache.render(self.small_font, f"Метроном: {metro_status}", TEXT_COLOR)
+        surface.blit(metro_text, (label_x, rows['metro']))
+        self.draw_setting_button(surface, buttons['metro_toggle'], metro_status,
+                                 PRIMARY_COLOR if self.metronome_enabled else BUTTON_SHADOW)
+
+        self.draw_setting_button(surface, buttons['accent_toggle'], "Акцент",
+                                 PRIMARY_COLOR if self.metronome_accent else BUTTON_SHADOW)
+
+        # Темп, размер, дробление доли и разгон темпа за рабочую фазу
+        beats, unit = self.metronome_signature
+        for name, label in (('tempo', f"Темп: {self.metronome_bpm} уд/мин"),
+                            ('signature', f"Размер: {beats}/{unit}"),
+                            ('subdivision', f"Дробление доли: x{self.metronome_subdivision}"),
+                            ('ramp', f"Разгон за сессию: {self.metronome_ramp:+d}")):
+            text = self.text_cache.render(self.small_font, label, TEXT_COLOR)
+            surface.blit(text, (label_x, rows[name]))
+            self.draw_setting_button(surface, buttons[name + '_minus'], "-", PRIMARY_COLOR)
+            self.draw_setting_button(surface, buttons[name + '_plus'], "+", PRIMARY_COLOR)
+
+        # Плотность фоновых нот
+        density_text = self.text_cache.render(self.small_font, f"Плотность нот: x{self.note_density:g}", TEXT_COLOR)
+        surface.blit(density_text, (label_x, rows['density']))
+        self.draw_setting_button(surface, buttons['density_minus'], "-", PRIMARY_COLOR)
+        self.draw_setting_button(surface, buttons['density_plus'], "+", PRIMARY_COLOR)
 
         # Кнопка закрытия
-        close_button = pygame.Rect(settings_rect.centerx - 60, settings_rect.bottom - 60, 120, 45)
-        pygame.draw.rect(screen, PRIMARY_COLOR, close_button, border_radius=12)
-        close_text = self.small_font.render("ЗАКРЫТЬ", True, WHITE)
-        screen.blit(close_text, (close_button.centerx - close_text.get_width()//2, close_button.centery - close_text.get_height()//2))
-
-        return {
-            'work_minus': work_minus,
-            'work_plus': work_plus,
-            'short_minus': short_minus,
-            'short_plus': short_plus,
-            'long_minus': long_minus,
-            'long_plus': long_plus,
-            'metro_toggle': metro_toggle,
-            'interval_minus': interval_minus,
-            'interval_plus': interval_plus,
-            'close_button': close_button
-        }
+        close_button = buttons['close_button']
+        pygame.draw.rect(surface, PRIMARY_COLOR, close_button, border_radius=12)
+        close_text = self.text_cache.render(self.small_font, "ЗАКРЫТЬ", WHITE)
+        surface.blit(close_text, (close_button.centerx - close_text.get_width()//2, close_button.centery - close_text.get_height()//2))
 
     def draw_setting_button(self, screen, rect, text, color):
         """Рисует кнопку настройки"""
         pygame.draw.rect(screen, color, rect, border_radius=8)
-        text_surface = self.font.render(text, True, WHITE)
+        text_surface = self.text_cache.render(self.font, text, WHITE)
         screen.blit(text_surface, (rect.centerx - text_surface.get_width()//2, rect.centery - text_surface.get_height()//2))
 
     def handle_settings_click(self, mouse_pos, buttons):
@@ -327,32 +374,65 @@ class Settings:
 
         changed = False
 
-        if buttons['work_minus'].collidepoint(mouse_pos) and self.work_time > 1:
+        if buttons['work_minus'].collidepoint(mouse_pos) and self.work_time > WORK_TIME_RANGE[0]:
             self.work_time -= 1
             changed = True
-        elif buttons['work_plus'].collidepoint(mouse_pos) and self.work_time < 60:
+        elif buttons['work_plus'].collidepoint(mouse_pos) and self.work_time < WORK_TIME_RANGE[1]:
             self.work_time += 1
             changed = True
-        elif buttons['short_minus'].collidepoint(mouse_pos) and self.short_break > 1:
+        elif buttons['short_minus'].collidepoint(mouse_pos) and self.short_break > SHORT_BREAK_RANGE[0]:
             self.short_break -= 1
             changed = True
-        elif buttons['short_plus'].collidepoint(mouse_pos) and self.short_break < 30:
+        elif buttons['short_plus'].collidepoint(mouse_pos) and self.short_break < SHORT_BREAK_RANGE[1]:
             self.short_break += 1
             changed = True
-        elif buttons['long_minus'].collidepoint(mouse_pos) and self.long_break > 5:
+        elif buttons['long_minus'].collidepoint(mouse_pos) and self.long_break > LONG_BREAK_RANGE[0]:
             self.long_break -= 1
             changed = True
-        elif buttons['long_plus'].collidepoint(mouse_pos) and self.long_break < 30:
+        elif buttons['long_plus'].collidepoint(mouse_pos) and self.long_break < LONG_BREAK_RANGE[1]:
             self.long_break += 1
             changed = True
         elif 'metro_toggle' in buttons and buttons['metro_toggle'].collidepoint(mouse_pos):
             self.metronome_enabled = not self.metronome_enabled
             changed = True
-        elif 'interval_minus' in buttons and buttons['interval_minus'].collidepoint(mouse_pos):
-            self.metronome_interval = max(0.3, round(self.metronome_interval - 0.1, 1))
+        elif 'accent_toggle' in buttons and buttons['accent_toggle'].collidepoint(mouse_pos):
+            self.metronome_accent = not self.metronome_accent
+            changed = True
+        elif 'tempo_minus' in buttons and buttons['tempo_minus'].collidepoint(mouse_pos):
+            self.metronome_bpm = max(MIN_BPM, self.metronome_bpm - 5)
             changed = True
-        elif 'interval_plus' in buttons and buttons['interval_plus'].collidepoint(mouse_pos):
-            self.metronome_interval = min(2.0, round(self.metronome_interval + 0.1, 1))
+        elif 'tempo_plus' in buttons and buttons['tempo_plus'].collidepoint(mouse_pos):
+            self.metronome_bpm = min(MAX_BPM, self.metronome_bpm + 5)
+            changed = True
+        elif 'signature_minus' in buttons and buttons['signature_minus'].collidepoint(mouse_pos):
+            index = SIGNATURES.index(self.metronome_signature)
+            self.metronome_signature = SIGNATURES[max(0, index - 1)]
+            changed = True
+        elif 'signature_plus' in buttons and buttons['signature_plus'].collidepoint(mouse_pos):
+            index = SIGNATURES.index(self.metronome_signature)
+            self.metronome_signature = SIGNATURES[min(len(SIGNATURES) - 1, index + 1)]
+            changed = True
+        elif 'subdivision_minus' in buttons and buttons['subdivision_minus'].collidepoint(mouse_pos):
+            index = SUBDIVISIONS.index(self.metronome_subdivision)
+            self.metronome_subdivision = SUBDIVISIONS[max(0, index - 1)]
+            changed = True
+        elif 'subdivision_plus' in buttons and buttons['subdivision_plus'].collidepoint(mouse_pos):
+            index = SUBDIVISIONS.index(self.metronome_subdivision)
+            self.metronome_subdivision = SUBDIVISIONS[min(len(SUBDIVISIONS) - 1, index + 1)]
+            changed = True
+        elif 'ramp_minus' in buttons and buttons['ramp_minus'].collidepoint(mouse_pos):
+            self.metronome_ramp = max(-MAX_RAMP_BPM, self.metronome_ramp - 5)
+            changed = True
+        elif 'ramp_plus' in buttons and buttons['ramp_plus'].collidepoint(mouse_pos):
+            self.metronome_ramp = min(MAX_RAMP_BPM, self.metronome_ramp + 5)
+            changed = True
+        elif 'density_minus' in buttons and buttons['density_minus'].collidepoint(mouse_pos):
+            index = NOTE_DENSITY_STEPS.index(self.note_density)
+            self.note_density = NOTE_DENSITY_STEPS[max(0, index - 1)]
+            changed = True
+        elif 'density_plus' in buttons and buttons['density_plus'].collidepoint(mouse_pos):
+            index = NOTE_DENSITY_STEPS.index(self.note_density)
+            self.note_density = NOTE_DENSITY_STEPS[min(len(NOTE_DENSITY_STEPS) - 1, index + 1)]
             changed = True
         elif buttons['close_button'].collidepoint(mouse_pos):
             self.show_settings = False
@@ -367,93 +447,160 @@ class Settings:
         return changed
 
 class PomodoroTimer:
-    def __init__(self, settings):
+    """Представление таймера в pygame: звук, анимация и отрисовка поверх TimerCore"""
+
+    def __init__(self, settings, clock=None, history=None):
         self.settings = settings
-        self.remaining_time = settings.get_work_time_seconds()
-        self.is_running = False
-        self.is_work_time = True
-        self.session_count = 0
+        # Фазы, сессии и отсчёт ведёт ядро без pygame; clock можно подменить в тестах
+        self.core = TimerCore(*self._durations(), clock=clock)
+        self.countdown = self.core.countdown
+        self.clock = self.core.clock
+        # Завершённые и прерванные фазы пишутся в журнал (см. --history)
+        self.history = history
+        self._phase_started_at = None  # Настенное время первого старта текущей фазы
         # Современные шрифты
-        self.time_font = pygame.font.SysFont('Arial', 72, bold=True)
-        self.title_font = pygame.font.SysFont('Arial', 24, bold=True)
-        self.small_font = pygame.font.SysFont('Arial', 18)
-        self.button_font = pygame.font.SysFont('Arial', 16, bold=True)
-        self.last_update_time = time.time()  # Добавляем временную метку
-        self.last_metronome_tick_time = time.time()
+        self.time_font = fonts.font('Arial', 72, bold=True)
+        self.title_font = fonts.font('Arial', 24, bold=True)
+        self.small_font = fonts.font('Arial', 18)
+        self.button_font = fonts.font('Arial', 16, bold=True)
+        # Цифры таймера собираются из заранее отрендеренных глифов,
+        # остальные надписи кэшируются
+        self.time_glyphs = GlyphAtlas(self.time_font, TEXT_COLOR)
+        self.text_cache = TextCache()
         # Анимация фоновых нот
         self._init_background_notes()
         self._last_bg_ticks = pygame.time.get_ticks()
+        # Учёт изменившихся областей экрана для частичного обновления дисплея
+        self.dirty = DirtyTracker((WIDTH, HEIGHT))
+        # Спрайты нот рендерятся один раз и дальше только блитятся
+        self.note_atlas = NoteSpriteAtlas()
+        # Статичные элементы интерфейса рисуются один раз и кэшируются
+        self.layers = LayerCache()
+        # Дуга прогресса дорисовывается инкрементально
+        self.progress_ring = ProgressRing(RING_RADIUS, RING_RADIUS + 5, WHITE, BUTTON_SHADOW)
+
+    def _durations(self):
+        settings = self.settings
+        return (settings.get_work_time_seconds(), settings.get_short_break_seconds(),
+                settings.get_long_break_seconds())
+
+    @property
+    def is_running(self):
+        return self.core.is_running
+
+    @property
+    def is_work_time(self):
+        return self.core.is_work_time
+
+    @property
+    def session_count(self):
+        return self.core.session_count
+
+    @property
+    def remaining_time(self):
+        """Оставшееся время фазы в целых секундах (с округлением вверх)"""
+        return self.countdown.remaining_seconds()
+
+    @remaining_time.setter
+    def remaining_time(self, seconds):
+        self.countdown.set_remaining(seconds)
 
     def start(self):
-        self.is_running = True
-        now = time.time()
-        self.last_update_time = now  # Обновляем временную метку
-        self.last_metronome_tick_time = now
+        if not self.core.phase_started():
+            self._phase_started_at = time.time()
+        self.core.start()
 
     def pause(self):
-        self.is_running = False
+        self.core.pause()
 
     def reset(self):
-        self.is_running = False
-        self.remaining_time = self.settings.get_work_time_seconds()
-        self.is_work_time = True
-        self.session_count = 0
-        self.last_metronome_tick_time = time.time()
+        self.core.set_durations(*self._durations())
+        self._record(self.core.reset())
 
     def toggle(self):
-        self.is_running = not self.is_running
         if self.is_running:
-            self.last_metronome_tick_time = time.time()
+            self.pause()
+        else:
+            self.start()
 
-    def update(self):
-        current_time = time.time()
-        if self.is_running:
-            # Обновляем время только если прошла至少 1 секунда
-            if current_time - self.last_update_time >= 1.0:
-                self.remaining_time -= 1
-                self.last_update_time = current_time
-
-                if self.remaining_time <= 0:
-                    self.play_alarm()
-                    self.switch_mode()
-
-            # Звук метронома во время работы
-            if self.is_work_time and self.settings.metronome_enabled and tick_sound:
-                if current_time - self.last_metronome_tick_time >= self.settings.metronome_interval - 1e-6:
-                    tick_sound.play()
-                    self.last_metronome_tick_time = current_time
-        # Обновляем анимацию фоновых нот
+    def _record(self, events):
+        """Пишет в журнал завершённые и прерванные фазы из событий ядра"""
+        for event in events:
+            if event.kind not in (PHASE_COMPLETE, PHASE_ABORTED):
+                continue
+            if self.history is not None:
+                now = time.time()
+                started_at = self._phase_started_at if self._phase_started_at is not None else now
+                self.history.append(started_at, now, event.duration, event.duration - event.remaining,
+                                    event.phase, event.kind == PHASE_ABORTED, event.session_count)
+            self._phase_started_at = None
+
+    def close(self):
+        """Записывает фазу, прерванную выходом, и закрывает журнал"""
+        self._record(self.core.interrupt())
+        if self.history is not None:
+            self.history.close()
+
+    def update(self, animate=True):
+        """Обновляет таймер; animate=False замораживает анимацию фоновых нот"""
+        # Остаток вычисляется от дедлайна, так что пропущенные кадры и
+        # подвисания не копят ошибку
+        self.core.set_durations(*self._durations())
+        events = self.core.update()
+        for event in events:
+            if event.kind == PHASE_COMPLETE:
+                self.play_alarm(event.phase == WORK)
+        self._record(events)
+        # Обновляем анимацию фоновых нот (пересоздаём их при смене плотности)
+        if self._bg_density != self.settings.note_density:
+            self._init_background_notes()
         now_ticks = pygame.time.get_ticks()
         dt_ms = max(1, now_ticks - self._last_bg_ticks)
         self._last_bg_ticks = now_ticks
-        self._update_background_notes(dt_ms / 1000.0)
+        if animate:
+            self._update_background_notes(dt_ms / 1000.0)
+
+    def is_animating(self):
+        """Есть ли на экране что-то, что двигается само по себе"""
+        return len(self._bg_notes) > 0
+
+    def metronome_active(self):
+        """Должен ли сейчас звучать метроном (идёт рабочая фаза)"""
+        return (self.is_running and self.is_work_time and self.settings.metronome_enabled
+                and not self.countdown.expired())
+
+    def phase_progress(self):
+        """Пройденная доля текущей фазы (0..1)"""
+        self.core.set_durations(*self._durations())
+        return self.core.progress()
+
+    def seconds_until_display_change(self):
+        """Через сколько секунд сменится показываемое время (None, если таймер стоит)"""
+        return self.core.seconds_until_tick()
+
+    def get_phase_seconds(self):
+        """Полная длительность текущей фазы (работа, короткий или длинный перерыв)"""
+        # Длительности берутся из настроек, но начатая фаза досчитывается
+        # с той, с которой началась
+        self.core.set_durations(*self._durations())
+        return self.core.phase_seconds()
 
     def switch_mode(self):
-        if self.is_work_time:
-            self.session_count += 1
-            if self.session_count % 4 == 0:
-                self.remaining_time = self.settings.get_long_break_seconds()
-            else:
-                self.remaining_time = self.settings.get_short_break_seconds()
-            self.is_work_time = False
-        else:
-            self.remaining_time = self.settings.get_work_time_seconds()
-            self.is_work_time = True
-
-        self.is_running = False
-        now = time.time()  # Обновляем временную метку
-        self.last_update_time = now
-        self.last_metronome_tick_time = now
+        # Новая фаза начинается на паузе
+        self.core.set_durations(*self._durations())
+        self.core.switch_mode()
 
-    def play_alarm(self):
-        if self.is_work_time:
+    def play_alarm(self, work_finished):
+        if work_finished:
             # Звук для завершения работы
+            work_alarm_sound = assets.sound(*ALARM_SOUNDS[0])
             if work_alarm_sound:
                 work_alarm_sound.play()
             else:
                 print("\a")  # Системный beep
         else:
             # Весёлый звук для начала перерыва
+            break_alarm_sound = assets.sound(*ALARM_SOUNDS[1])
             if break_alarm_sound:
                 break_alarm_sound.play()
             else:
@@ -462,8 +609,7 @@ class PomodoroTimer:
                 print("\a\a")  # Двойной beep
 
     def _init_background_notes(self):
-        """Создает список фоновых нот с позициями и скоростями"""
-        import random
+        """Создает фоновые ноты с позициями и скоростями"""
         self._bg_colors = [
             (239, 71, 111, 70),
             (6, 214, 160, 70),
@@ -471,171 +617,47 @@ class PomodoroTimer:
             (255, 180, 0, 60),
             (0, 150, 255, 60),
         ]
-        self._bg_notes = []
+        self._bg_density = self.settings.note_density
+        self._bg_notes = NoteField(WIDTH, HEIGHT, self._bg_colors, BG_NOTE_MAX_SIZE)
         # Крупные
-        for _ in range(8):
+        for _ in range(int(round(BG_LARGE_NOTES * self._bg_density))):
             vx = random.uniform(-80, 80) / 100.0
             vy = random.uniform(-80, 80) / 100.0
-            self._bg_notes.append({
-                'x': random.uniform(30, WIDTH - 30),
-                'y': random.uniform(30, HEIGHT - 30),
-                'size': random.uniform(26, 42),
-                'color': random.choice(self._bg_colors),
-                'vx': vx,
-                'vy': vy,
-                'original_vx': vx,  # Сохраняем исходную скорость
-                'original_vy': vy,
-            })
+            self._bg_notes.add(
+                x=random.uniform(30, WIDTH - 30),
+                y=random.uniform(30, HEIGHT - 30),
+                size=random.uniform(26, 42),
+                color_index=random.randrange(len(self._bg_colors)),
+                vx=vx,
+                vy=vy,
+            )
         # Мелкие
-        for _ in range(18):
+        for _ in range(int(round(BG_SMALL_NOTES * self._bg_density))):
             vx = random.uniform(-100, 100) / 100.0
             vy = random.uniform(-100, 100) / 100.0
-            self._bg_notes.append({
-                'x': random.uniform(20, WIDTH - 20),
-                'y': random.uniform(20, HEIGHT - 20),
-                'size': random.uniform(12, 20),
-                'color': random.choice(self._bg_colors),
-                'vx': vx,
-                'vy': vy,
-                'original_vx': vx,  # Сохраняем исходную скорость
-                'original_vy': vy,
-            })
+            self._bg_notes.add(
+                x=random.uniform(20, WIDTH - 20),
+                y=random.uniform(20, HEIGHT - 20),
+                size=random.uniform(12, 20),
+                color_index=random.randrange(len(self._bg_colors)),
+                vx=vx,
+                vy=vy,
+            )
+        self._bg_notes.pack()
 
     def _update_background_notes(self, dt):
         """Обновляет позиции нот с физикой столкновений и отскоков от краев"""
-        speed_scale = 50.0  # Увеличенный множитель скорости (px/сек)
-
-        # Получаем позицию курсора
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_x, mouse_y = mouse_pos
-        cursor_radius = 30  # Радиус влияния курсора
-        repulsion_strength = 150.0  # Сила отталкивания от курсора
-
-        # Коэффициент плавного возвращения к исходной скорости
-        # За 6 секунд скорость вернется примерно на 95% к исходной
-        restore_factor = 0.5  # Скорость восстановления (0.5 = медленно, 2.0 = быстро)
-
-        # Обновляем позиции
-        for n in self._bg_notes:
-            n['x'] += n['vx'] * speed_scale * dt
-            n['y'] += n['vy'] * speed_scale * dt
-
-            # Отталкивание от курсора
-            dx_cursor = n['x'] - mouse_x
-            dy_cursor = n['y'] - mouse_y
-            distance_cursor = math.sqrt(dx_cursor * dx_cursor + dy_cursor * dy_cursor)
-
-            if distance_cursor < cursor_radius and distance_cursor > 0:
-                # Нормализуем вектор от курсора к ноте
-                nx_cursor = dx_cursor / distance_cursor
-                ny_cursor = dy_cursor / distance_cursor
-
-                # Сила отталкивания обратно пропорциональна расстоянию
-                force = repulsion_strength * (1 - distance_cursor / cursor_radius)
-
-                # Применяем силу к скорости
-                n['vx'] += nx_cursor * force * dt
-                n['vy'] += ny_cursor * force * dt
-
-            # Плавное возвращение к исходной скорости (демпфирование к target velocity)
-            # Используем экспоненциальное сглаживание
-            damping = 1.0 - math.exp(-restore_factor * dt)
-            n['vx'] += (n['original_vx'] - n['vx']) * damping
-            n['vy'] += (n['original_vy'] - n['vy']) * damping
-
-            # Отскок от краев окна
-            radius = n['size'] * 0.5
-            if n['x'] - radius < 0:
-                n['x'] = radius
-                n['vx'] = abs(n['vx'])  # Отскок вправо
-                n['original_vx'] = abs(n['original_vx'])  # Обновляем исходную скорость
-            elif n['x'] + radius > WIDTH:
-                n['x'] = WIDTH - radius
-                n['vx'] = -abs(n['vx'])  # Отскок влево
-                n['original_vx'] = -abs(n['original_vx'])  # Обновляем исходную скорость
-
-            if n['y'] - radius < 0:
-                n['y'] = radius
-                n['vy'] = abs(n['vy'])  # Отскок вниз
-                n['original_vy'] = abs(n['original_vy'])  # Обновляем исходную скорость
-            elif n['y'] + radius > HEIGHT:
-                n['y'] = HEIGHT - radius
-                n['vy'] = -abs(n['vy'])  # Отскок вверх
-                n['original_vy'] = -abs(n['original_vy'])  # Обновляем исходную скорость
-
-        # Проверка столкновений между нотами
-        for i in range(len(self._bg_notes)):
-            for j in range(i + 1, len(self._bg_notes)):
-                n1 = self._bg_notes[i]
-                n2 = self._bg_notes[j]
-
-                # Расстояние между центрами
-                dx = n2['x'] - n1['x']
-                dy = n2['y'] - n1['y']
-                distance = math.sqrt(dx * dx + dy * dy)
-
-                # Радиусы столкновения
-                r1 = n1['size'] * 0.5
-                r2 = n2['size'] * 0.5
-                min_distance = r1 + r2
-
-                if distance < min_distance and distance > 0:
-                    # Нормализация вектора
-                    nx = dx / distance
-                    ny = dy / distance
-
-                    # Отталкивание - перемещаем ноты так, чтобы они не пересекались
-                    overlap = min_distance - distance
-                    n1['x'] -= nx * overlap * 0.5
-                    n1['y'] -= ny * overlap * 0.5
-                    n2['x'] += nx * overlap * 0.5
-                    n2['y'] += ny * overlap * 0.5
-
-                    # Отражение скоростей относительно нормали столкновения
-                    # Сохраняем модуль скорости каждой ноты, меняем только направление
-                    # Проверяем, сближаются ли ноты (относительная скорость направлена навстречу)
-                    relative_vx = n2['vx'] - n1['vx']
-                    relative_vy = n2['vy'] - n1['vy']
-                    dot_relative = relative_vx * nx + relative_vy * ny
-
-                    # Отражаем только если сближаются
-                    if dot_relative < 0:
-                        # Сохраняем модули скоростей
-                        speed1 = math.sqrt(n1['vx']**2 + n1['vy']**2)
-                        speed2 = math.sqrt(n2['vx']**2 + n2['vy']**2)
-
-                        # Проекция скорости n1 на нормаль
-                        dot1 = n1['vx'] * nx + n1['vy'] * ny
-                        # Отражение: вычитаем двойную проекцию
-                        n1['vx'] -= 2 * dot1 * nx
-                        n1['vy'] -= 2 * dot1 * ny
-
-                        # Проекция скорости n2 на нормаль
-                        dot2 = n2['vx'] * nx + n2['vy'] * ny
-                        # Отражение: вычитаем двойную проекцию
-                        n2['vx'] -= 2 * dot2 * nx
-                        n2['vy'] -= 2 * dot2 * ny
-
-                        # Восстанавливаем исходные модули скоростей (на случай погрешностей)
-                        new_speed1 = math.sqrt(n1['vx']**2 + n1['vy']**2)
-                        new_speed2 = math.sqrt(n2['vx']**2 + n2['vy']**2)
-                        if new_speed1 > 0:
-                            n1['vx'] = n1['vx'] * speed1 / new_speed1
-                            n1['vy'] = n1['vy'] * speed1 / new_speed1
-                        if new_speed2 > 0:
-                            n2['vx'] = n2['vx'] * speed2 / new_speed2
-                            n2['vy'] = n2['vy'] * speed2 / new_speed2
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        self._bg_notes.step(dt, mouse_x, mouse_y)
 
     def draw_stars(self, screen):
-        """Рендерит фоновые ноты с альфой"""
-        bg = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        for n in self._bg_notes:
-            self.draw_note(bg, n['x'], n['y'], n['size'], n['color'])
-        screen.blit(bg, (0, 0))
+        """Рендерит фоновые ноты с альфой (одним пакетом из атласа спрайтов)"""
+        rects = self.note_atlas.draw_many(screen, self._bg_notes.notes())
+        for i, rect in enumerate(rects):
+            self.dirty.mark(('note', i), rect)
 
     def draw_violin_key(self, screen, x, y, size, color):
         """Рисует скрипичный ключ (treble clef)"""
-        import math
 
         line_width = 2
 
@@ -678,75 +700,8 @@ class PomodoroTimer:
             pygame.draw.line(screen, color, points[i], points[i + 1], line_width)
 
     def draw_note(self, screen, x, y, size, color):
-        """Рисует музыкальную ноту с антиалиасингом"""
-        try:
-            from pygame import gfxdraw
-
-            # Преобразуем цвет - убираем альфа-канал для gfxdraw
-            if len(color) == 4:
-                draw_color = color[:3]  # Берём только RGB
-                alpha = color[3]
-            else:
-                draw_color = color
-                alpha = 255
-
-            # Координаты для эллипса (головки ноты)
-            center_x = int(round(x))
-            center_y = int(round(y))
-            rx = int(round(size * 0.3))  # радиус по X
-            ry = int(round(size * 0.2))  # радиус по Y
-
-            # Если есть альфа, рисуем на отдельной поверхности
-            if alpha < 255:
-                temp_surf = pygame.Surface((rx*2 + 10, ry*2 + stem_height + 10), pygame.SRCALPHA)
-                temp_center_x = rx + 5
-                temp_center_y = ry + 5
-
-                gfxdraw.filled_ellipse(temp_surf, temp_center_x, temp_center_y, rx, ry, color)
-                gfxdraw.aaellipse(temp_surf, temp_center_x, temp_center_y, rx, ry, color)
-
-                # Стебель
-                stem_width = 2
-                stem_height = int(round(size * 0.8))
-                stem_x = temp_center_x + rx - 2
-                stem_y_top = temp_center_y - ry + 4
-                for offset in range(stem_width):
-                    pygame.draw.aaline(temp_surf, color,
-                                     (stem_x + offset, stem_y_top),
-                                     (stem_x + offset, stem_y_top - stem_height))
-
-                screen.blit(temp_surf, (center_x - rx - 5, center_y - ry - 5))
-            else:
-                # Рисуем заполненный эллипс с антиалиасингом
-                gfxdraw.filled_ellipse(screen, center_x, center_y, rx, ry, draw_color)
-                gfxdraw.aaellipse(screen, center_x, center_y, rx, ry, draw_color)
-
-                # Стебель: от правого края эллипса вверх
-                stem_width = 2
-                stem_height = int(round(size * 0.8))
-                stem_x = center_x + rx - 2
-                stem_y_top = center_y - ry + 4
-
-                # Рисуем стебель с антиалиасингом (толстая линия через несколько тонких)
-                for offset in range(stem_width):
-                    pygame.draw.aaline(screen, draw_color,
-                                     (stem_x + offset, stem_y_top),
-                                     (stem_x + offset, stem_y_top - stem_height))
-        except Exception as e:
-            # Fallback на обычное рисование
-            rect_x = int(round(x - size * 0.3))
-            rect_y = int(round(y - size * 0.2))
-            rect_w = int(round(size * 0.6))
-            rect_h = int(round(size * 0.4))
-
-            note_rect = pygame.Rect(rect_x, rect_y, rect_w, rect_h)
-            pygame.draw.ellipse(screen, color, note_rect)
-
-            stem_width = 2
-            stem_height = int(round(size * 0.8))
-            stem_x = note_rect.right - 2
-            stem_y_top = note_rect.top + 4
-            pygame.draw.line(screen, color, (stem_x, stem_y_top), (stem_x, stem_y_top - stem_height), stem_width)
+        """Рисует музыкальную ноту с антиалиасингом (спрайт из атласа)"""
+        return self.note_atlas.draw(screen, x, y, size, color)
 
     def format_time(self, seconds):
         minutes = seconds // 60
@@ -763,49 +718,39 @@ class PomodoroTimer:
         # Определяем цвет акцента в зависимости от режима
         accent_color = WORK_COLOR if self.is_work_time else BREAK_COLOR
 
-        # Рисуем круговой прогресс-бар (декоративный)
-        total_time = self.settings.get_work_time_seconds() if self.is_work_time else self.settings.get_short_break_seconds()
+        # Рисуем круговой прогресс-бар: фоновый диск и дуга хранятся в
+        # ProgressRing, который дорисовывает только изменившийся сектор
+        total_time = self.get_phase_seconds()
         progress = 1 - (self.remaining_time / total_time) if total_time > 0 else 0
         center = (WIDTH // 2, HEIGHT // 2 - 30)
-        radius = 120
-
-        # Фоновая окружность
-        pygame.draw.circle(screen, WHITE, center, radius + 5)
-        pygame.draw.circle(screen, BUTTON_SHADOW, center, radius + 5, 2)
-
-        # Прогресс (дуга) - рисуем через полигон
-        if progress > 0:
-            end_angle = -90 + (360 * progress)
-            points = [center]
-            for angle in range(-90, int(end_angle), 2):
-                rad = angle * 3.14159 / 180
-                x = center[0] + int(radius * -pygame.math.Vector2(0, 1).rotate(angle).x)
-                y = center[1] + int(radius * -pygame.math.Vector2(0, 1).rotate(angle).y)
-                points.append((x, y))
-            if len(points) > 2:
-                pygame.draw.polygon(screen, accent_color, points)
+        radius = RING_RADIUS
+
+        self.progress_ring.update(progress, accent_color)
+        ring_rect = self.progress_ring.draw(screen, center)
+        self.dirty.mark('ring', ring_rect, (accent_color, self.progress_ring.angle))
 
         # Внутренняя белая окружность
-        pygame.draw.circle(screen, WHITE, center, radius - 8)
+        self._blit_ring_circle(screen, 'ring_inner', center, radius - 8)
 
         # Отображение времени (большой шрифт)
         time_text = self.format_time(self.remaining_time)
-        time_surface = self.time_font.render(time_text, True, TEXT_COLOR)
-        time_rect = time_surface.get_rect(center=center)
-        screen.blit(time_surface, time_rect)
+        time_rect = self.time_glyphs.draw(screen, time_text, center)
+        self.dirty.mark('time', time_rect, time_text)
 
         # Отображение режима (над временем, маленький текст)
         mode_text = "РАБОТА" if self.is_work_time else "ОТДЫХ"
-        mode_surface = self.small_font.render(mode_text, True, accent_color)
+        mode_surface = self.text_cache.render(self.small_font, mode_text, accent_color)
         mode_rect = mode_surface.get_rect(center=(WIDTH//2, center[1] - 55))
         screen.blit(mode_surface, mode_rect)
+        self.dirty.mark('mode', mode_rect, mode_text)
 
         # Отображение сессий (под временем)
         if self.session_count > 0:
             sessions_text = f"Сессия {self.session_count}"
-            sessions_surface = self.small_font.render(sessions_text, True, TEXT_LIGHT)
+            sessions_surface = self.text_cache.render(self.small_font, sessions_text, TEXT_LIGHT)
             sessions_rect = sessions_surface.get_rect(center=(WIDTH//2, center[1] + 55))
             screen.blit(sessions_surface, sessions_rect)
+            self.dirty.mark('sessions', sessions_rect, sessions_text)
 
         # Кнопки внизу (современный дизайн)
         button_y = HEIGHT - 60
@@ -814,29 +759,40 @@ class PomodoroTimer:
         start_button_text = "ПАУЗА" if self.is_running else "СТАРТ"
         start_button_rect = pygame.Rect(WIDTH//2 - 110, button_y, 100, 45)
         self.draw_modern_button(screen, start_button_rect, start_button_text, PRIMARY_COLOR, WHITE)
+        self.dirty.mark('start_button', start_button_rect.inflate(0, 4), start_button_text)
 
         # Кнопка сброса
         reset_button_rect = pygame.Rect(WIDTH//2 + 10, button_y, 100, 45)
         self.draw_modern_button(screen, reset_button_rect, "СБРОС", BUTTON_BG, TEXT_COLOR, border=True)
+        self.dirty.mark('reset_button', reset_button_rect.inflate(0, 4))
 
         # Кнопка настроек (в углу)
         settings_button_rect = pygame.Rect(WIDTH - 70, 20, 55, 45)
         # Используем более светлый цвет для шестерёнки
         gear_color = (150, 150, 160)  # Светло-серый вместо TEXT_COLOR
         self.draw_modern_button(screen, settings_button_rect, "", BUTTON_BG, gear_color, border=True, small=True, is_gear=True)
+        self.dirty.mark('settings_button', settings_button_rect.inflate(0, 4))
 
         # Отображаем настройки поверх всего если они открыты
         if self.settings.show_settings:
-            settings_buttons = self.settings.draw_settings(screen)
+            self.settings.draw_settings(screen)
+            # Оверлей закрывает весь экран: его появление и любое изменение значений
+            # требуют полной перерисовки
+            self.dirty.mark('settings', (0, 0, WIDTH, HEIGHT), self.settings.panel_state())
 
-        pygame.display.flip()
-
-        # Возвращаем rect'ы кнопок для обработки кликов
+        # Возвращаем rect'ы кнопок для обработки кликов (вывод на дисплей - в present())
         return start_button_rect, reset_button_rect, settings_button_rect
 
+    def present(self):
+        """Выводит кадр на дисплей: только изменившиеся области или весь экран"""
+        if DIRTY_RECT_RENDERING:
+            pygame.display.update(self.dirty.collect())
+        else:
+            self.dirty.collect()
+            pygame.display.flip()
+
     def draw_gear_icon(self, screen, x, y, size, color):
         """Рисует иконку шестерёнки с антиалиасингом"""
-        import math
 
         center_x, center_y = int(x), int(y)
         outer_radius = size
@@ -878,28 +834,35 @@ class PomodoroTimer:
 
         # Рисуем шестерёнку с антиалиасингом
         if len(points) >= 3:
-            # Используем gfxdraw для сглаживания
-            try:
-                from pygame import gfxdraw
-                # Рисуем заполненный полигон
-                gfxdraw.filled_polygon(screen, points, color)
-                # Рисуем сглаженный контур
-                gfxdraw.aapolygon(screen, points, color)
-            except:
-                # Fallback если gfxdraw недоступен
-                pygame.draw.polygon(screen, color, points)
+            # Рисуем заполненный полигон
+            gfxdraw.filled_polygon(screen, points, color)
+            # Рисуем сглаженный контур
+            gfxdraw.aapolygon(screen, points, color)
 
         # Рисуем центральное отверстие (круг) с антиалиасингом
-        try:
-            from pygame import gfxdraw
-            gfxdraw.filled_circle(screen, center_x, center_y, int(hole_radius), BUTTON_BG)
-            gfxdraw.aacircle(screen, center_x, center_y, int(hole_radius), color)
-        except:
-            pygame.draw.circle(screen, BUTTON_BG, (center_x, center_y), int(hole_radius))
-            pygame.draw.circle(screen, color, (center_x, center_y), int(hole_radius), 1)
+        gfxdraw.filled_circle(screen, center_x, center_y, int(hole_radius), BUTTON_BG)
+        gfxdraw.aacircle(screen, center_x, center_y, int(hole_radius), color)
+
+    def _blit_ring_circle(self, screen, slot, center, radius):
+        """Блитит белый круг кольца из кэша слоёв"""
+        def render(surface):
+            pygame.draw.circle(surface, WHITE, (radius + 1, radius + 1), radius)
+
+        size = (2 * radius + 2, 2 * radius + 2)
+        layer = self.layers.get(slot, radius, size, render)
+        return screen.blit(layer, (center[0] - radius - 1, center[1] - radius - 1))
 
     def draw_modern_button(self, screen, rect, text, bg_color, text_color, border=False, small=False, is_gear=False):
-        """Рисует современную кнопку с тенью"""
+        """Рисует современную кнопку с тенью (из кэша слоёв, перерисовка - только при изменении)"""
+        key = (rect.size, text, bg_color, text_color, border, small, is_gear)
+        local_rect = pygame.Rect((0, 0), rect.size)
+        layer = self.layers.get(('button', rect.topleft), key, (rect.width, rect.height + 2),
+                                lambda surface: self._render_modern_button(
+                                    surface, local_rect, text, bg_color, text_color, border, small, is_gear))
+        screen.blit(layer, rect.topleft)
+
+    def _render_modern_button(self, screen, rect, text, bg_color, text_color, border, small, is_gear):
+        """Рисует кнопку с тенью на поверхность слоя"""
         # Тень
         shadow_rect = rect.copy()
         shadow_rect.y += 2
@@ -920,51 +883,191 @@ class PomodoroTimer:
         else:
             # Текст
             font = self.small_font if small else self.button_font
-            text_surface = font.render(text, True, text_color)
+            text_surface = self.text_cache.render(font, text, text_color)
             text_rect = text_surface.get_rect(center=rect.center)
             screen.blit(text_surface, text_rect)
 
-def main():
-    clock = pygame.time.Clock()
-    settings = Settings()
-    timer = PomodoroTimer(settings)
-
-    running = True
-    while running:
-        start_button_rect, reset_button_rect, settings_button_rect = timer.draw(screen)
-        settings_buttons = settings.draw_settings(screen)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    timer.toggle()
-                elif event.key == pygame.K_r:
-                    timer.reset()
-                elif event.key == pygame.K_s:
-                    settings.show_settings = not settings.show_settings
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Левая кнопка мыши
-                    mouse_pos = pygame.mouse.get_pos()
-                    if start_button_rect.collidepoint(mouse_pos):
-                        timer.toggle()
-                    elif reset_button_rect.collidepoint(mouse_pos):
-                        timer.reset()
-                    elif settings_button_rect.collidepoint(mouse_pos):
-                        settings.show_settings = not settings.show_settings
-                    elif settings_buttons and settings.handle_settings_click(mouse_pos, settings_buttons):
-                        pass # Settings button handled
+def calibrate_audio(settings):
+    """Подбирает размер аудиобуфера и сохраняет его в настройках"""
+    print(f"Калибровка звука: {settings.audio_frequency} Гц, каналов: {settings.audio_channels}")
+    buffer, results = calibrate(settings.audio_frequency, settings.audio_channels)
+    print(f"{'Буфер':>6}  {'Покой, мс':>10}  {'Нагрузка, мс':>13}  {'Разброс, мс':>12}  Сбои")
+    for size, idle, busy, jitter, failures in results:
+        row = [f"{value:.1f}" if value is not None else "-" for value in (idle, busy, jitter)]
+        print(f"{size:>6}  {row[0]:>10}  {row[1]:>13}  {row[2]:>12}  {failures}")
+    if buffer is None:
+        print("⚠️  Не удалось открыть аудиовыход, настройки не изменены")
+        return
+    settings.audio_buffer = buffer
+    settings.save_settings()
+    settings.flush_settings()
+    print(f"✓ Рекомендуемый буфер: {buffer} отсчётов; применится при следующем запуске")
+
+
+def show_history(days=0):
+    """Печатает сводку журнала фаз за последние days дней (0 - за всё время)"""
+    since = time.time() - days * 86400 if days else None
+    summary = HistoryReader().summary(since)
+    names = {'work': "Работа", 'short_break': "Короткий перерыв", 'long_break': "Длинный перерыв"}
+    print(f"{'Фаза':<18}  {'Завершено':>9}  {'Прервано':>8}  {'Часов':>7}")
+    for phase in PHASES:
+        done, interrupted, seconds = summary[phase]
+        print(f"{names[phase]:<18}  {done:>9}  {interrupted:>8}  {seconds / 3600:>7.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="pomodoro-timer", description="Pomodoro Timer")
+    parser.add_argument('--calibrate-audio', action='store_true',
+                        help="измерить задержку звука, подобрать размер буфера и сохранить его")
+    parser.add_argument('--rebuild-font-cache', action='store_true',
+                        help="заново найти системные шрифты и обновить их кэш")
+    parser.add_argument('--history', type=int, nargs='?', const=0, metavar='DAYS',
+                        help="показать сводку по истории фаз (за последние DAYS дней)")
+    parser.add_argument('--serve', nargs='?', const='', metavar='ADDRESS',
+                        help="запустить сервер таймеров без окна (host:port или путь к Unix-сокету)")
+    return parser.parse_args(argv)
+
+
+def init_pygame(settings_file=SETTINGS_FILE):
+    """Инициализирует pygame; параметры микшера (размер буфера и т.д.)
+    берутся из настроек и должны быть заданы до pygame.init()"""
+    configure_mixer(**read_audio_settings(settings_file))
+    pygame.init()
+    try:
+        mixer.init()
+    except pygame.error as e:
+        print(f"⚠️  Звук недоступен: {e}")
 
-        if settings.show_settings:
-            # If settings are shown, update settings and redraw
-            settings_buttons = settings.draw_settings(screen)
-        else:
-            # If settings are not shown, update timer and redraw
-            timer.update()
 
-        clock.tick(60)  # Обновление с FPS 60 для плавного интерфейса
+class PomodoroApp:
+    """Окно приложения, его состояние и главный цикл"""
 
+    def __init__(self, screen, settings, timer):
+        self.screen = screen
+        self.settings = settings
+        self.timer = timer
+        # Частота кадров подстраивается под происходящее: 60 FPS во время анимации,
+        # ожидание событий в простое и никакой отрисовки в скрытом окне
+        self.scheduler = FrameScheduler()
+        # Тики играет микшер из заранее отрендеренного такта, а не кадры цикла
+        self.metronome = Metronome()
+        # Фоновая музыка генерируется кусками в отдельном потоке
+        self.music = MusicPlayer()
+
+    def run(self):
+        """Главный цикл; возвращается, когда окно закрыто"""
+        screen, settings, timer = self.screen, self.settings, self.timer
+        scheduler, metronome, music = self.scheduler, self.metronome, self.music
+
+        running = True
+        events = []
+        preloaded = False
+        while running:
+            if scheduler.should_render():
+                start_button_rect, reset_button_rect, settings_button_rect = timer.draw(screen)
+                timer.present()
+                if not preloaded:
+                    # Окно уже показано - звуки сигналов можно грузить в фоне
+                    assets.preload(*ALARM_SOUNDS)
+                    preloaded = True
+            settings_buttons = settings.buttons if settings.show_settings else None
+
+            for event in events:
+                scheduler.observe(event)
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                    # Содержимое окна потеряно - нужен полный кадр
+                    timer.dirty.invalidate()
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        timer.toggle()
+                    elif event.key == pygame.K_r:
+                        timer.reset()
+                    elif event.key == pygame.K_s:
+                        settings.show_settings = not settings.show_settings
+                    elif event.key == pygame.K_m:
+                        settings.music_enabled = not settings.music_enabled
+                        settings.save_settings()
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:  # Левая кнопка мыши
+                        mouse_pos = pygame.mouse.get_pos()
+                        if start_button_rect.collidepoint(mouse_pos):
+                            timer.toggle()
+                        elif reset_button_rect.collidepoint(mouse_pos):
+                            timer.reset()
+                        elif settings_button_rect.collidepoint(mouse_pos):
+                            settings.show_settings = not settings.show_settings
+                        elif settings_buttons and settings.handle_settings_click(mouse_pos, settings_buttons):
+                            pass # Settings button handled
+
+            # Файл настроек мог переписать внешний инструмент: подхватываем
+            # правку без перезапуска (длительности фаз таймер берёт из настроек)
+            if settings.reload_if_changed():
+                timer.dirty.invalidate()
+
+            # Анимация нужна только в видимом окне с фокусом, пока идёт таймер
+            # или пользователь недавно что-то делал
+            animating = (not settings.show_settings and timer.is_animating()
+                         and (timer.is_running or scheduler.recent_input()))
+            scheduler.choose(animating, wake_in=timer.seconds_until_display_change())
+
+            # Отсчёт идёт и при открытых настройках (как метроном и музыка):
+            # фаза должна закончиться, прозвенеть и попасть в историю вовремя.
+            # Под панелью замирает только анимация нот
+            timer.update(animate=scheduler.mode == ACTIVE and not settings.show_settings)
+            # Метроном подкладывает буфер в очередь канала, в том числе при
+            # открытых настройках; METRONOME_EVENT будит цикл к концу буфера
+            metronome.sync(timer.metronome_active(), settings.metronome_pattern(), timer.phase_progress())
+            # Музыка звучит во время работы и плавно затихает на паузе и при
+            # смене фазы (новая фаза начинается на паузе)
+            music.sync(timer.is_running and timer.is_work_time and settings.music_enabled)
+
+            events = scheduler.wait()
+
+        self.close()
+
+    def close(self):
+        """Останавливает звук и фоновые потоки и дописывает настройки"""
+        self.metronome.close()
+        self.music.close()
+        self.timer.close()
+        self.settings.flush_settings()
+
+
+def create_app():
+    """Поднимает pygame, открывает окно и собирает приложение"""
+    init_pygame()
+    # Устанавливаем иконку ПЕРЕД созданием окна (важно!)
+    icon = load_icon()
+    if icon:
+        pygame.display.set_icon(icon)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Pomodoro Timer")
+    settings = Settings()
+    return PomodoroApp(screen, settings, PomodoroTimer(settings, history=HistoryLog()))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve is not None:
+        # Серверу не нужны ни окно, ни звук, а окну не нужен asyncio
+        from .server import DEFAULT_ADDRESS, serve
+        serve(args.serve or DEFAULT_ADDRESS)
+        return
+    if args.calibrate_audio:
+        # Окно для калибровки не нужно
+        init_pygame()
+        calibrate_audio(Settings())
+        pygame.quit()
+        return
+    if args.rebuild_font_cache:
+        fonts.rebuild()
+        return
+    if args.history is not None:
+        show_history(args.history)
+        return
+    create_app().run()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,326 @@
+"""
+Вспомогательные средства отрисовки для Pomodoro Timer.
+
+Здесь собраны объекты, которые помогают не делать лишнюю работу в кадре:
+учёт «грязных» областей экрана, атлас предрендеренных спрайтов нот,
+кэш статичных слоёв интерфейса, инкрементальное кольцо прогресса, кэш
+отрендеренного текста и т.п.
+"""
+
+import math
+from collections import OrderedDict
+
+import pygame
+from pygame import gfxdraw
+
+# Если грязных прямоугольников слишком много или они покрывают большую часть
+# экрана, дешевле отправить один прямоугольник на весь экран
+MAX_DIRTY_RECTS = 64
+MAX_DIRTY_AREA_RATIO = 0.5
+
+# Цвет прозрачного фона кэшированных слоёв интерфейса
+LAYER_COLORKEY = (255, 0, 255)
+
+
+class DirtyTracker:
+    """Отслеживает изменившиеся области экрана между кадрами.
+
+    Каждый элемент сцены в кадре сообщает свою область и «состояние»
+    (текст, цвет, прогресс...). Если область или состояние элемента изменились
+    по сравнению с прошлым кадром, грязными считаются и старая, и новая области.
+    """
+
+    def __init__(self, size):
+        self.bounds = pygame.Rect((0, 0), size)
+        self._prev = {}
+        self._curr = {}
+        self._full = True
+
+    def invalidate(self):
+        """Помечает весь экран для перерисовки (первый кадр, expose окна и т.п.)"""
+        self._full = True
+
+    def mark(self, key, rect, state=None):
+        """Регистрирует область, занятую элементом в текущем кадре"""
+        self._curr[key] = (pygame.Rect(rect), state)
+
+    def collect(self):
+        """Возвращает список грязных прямоугольников и начинает новый кадр"""
+        prev, curr = self._prev, self._curr
+        self._prev, self._curr = curr, {}
+
+        if self._full:
+            self._full = False
+            return [self.bounds.copy()]
+
+        rects = []
+        for key, entry in curr.items():
+            old = prev.get(key)
+            if old == entry:
+                continue
+            rect = entry[0]
+            if old is None:
+                rects.append(rect)
+            elif old[0].colliderect(rect):
+                rects.append(old[0].union(rect))
+            else:
+                rects.append(old[0])
+                rects.append(rect)
+
+        # Элементы, исчезнувшие с экрана, тоже нужно стереть
+        for key, old in prev.items():
+            if key not in curr:
+                rects.append(old[0])
+
+        rects = [r.clip(self.bounds) for r in rects]
+        rects = [r for r in rects if r.width > 0 and r.height > 0]
+
+        if len(rects) > MAX_DIRTY_RECTS:
+            return [self.bounds.copy()]
+        area = sum(r.width * r.height for r in rects)
+        if area > self.bounds.width * self.bounds.height * MAX_DIRTY_AREA_RATIO:
+            return [self.bounds.copy()]
+        return rects
+
+
+class NoteSpriteAtlas:
+    """Атлас спрайтов музыкальных нот.
+
+    Каждая нота рисуется с антиалиасингом один раз для пары (размер, цвет)
+    на отдельную SRCALPHA-поверхность; в кадре спрайты только блитятся.
+    Размер округляется до целого пикселя - это и есть «корзина» размера.
+    """
+
+    def __init__(self):
+        self._sprites = {}
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def sprite(self, size, color):
+        """Возвращает (surface, (ox, oy)): спрайт и смещение его угла от центра головки ноты"""
+        key = (int(round(size)), tuple(color))
+        entry = self._sprites.get(key)
+        if entry is None:
+            entry = self._sprites[key] = self._render(*key)
+        return entry
+
+    def draw(self, screen, x, y, size, color):
+        """Рисует одну ноту и возвращает занятый прямоугольник"""
+        surface, (ox, oy) = self.sprite(size, color)
+        return screen.blit(surface, (int(round(x)) + ox, int(round(y)) + oy))
+
+    def draw_many(self, screen, notes):
+        """Рисует ноты (x, y, size, color) одним вызовом Surface.blits.
+
+        Возвращает список прямоугольников, занятых нотами.
+        """
+        sprite = self.sprite
+        batch = []
+        for x, y, size, color in notes:
+            surface, (ox, oy) = sprite(size, color)
+            batch.append((surface, (int(round(x)) + ox, int(round(y)) + oy)))
+        return screen.blits(batch)
+
+    @staticmethod
+    def _render(size, color):
+        rgb = color[:3]
+        alpha = color[3] if len(color) == 4 else 255
+
+        rx = int(round(size * 0.3))  # радиус головки по X
+        ry = int(round(size * 0.2))  # радиус головки по Y
+        stem_height = int(round(size * 0.8))
+        stem_width = 2
+
+        # Головка внизу, штиль уходит вверх от правого края эллипса
+        center_x = rx + 2
+        center_y = stem_height + ry - 2
+        surface = pygame.Surface((2 * rx + 5, center_y + ry + 3), pygame.SRCALPHA)
+
+        gfxdraw.filled_ellipse(surface, center_x, center_y, rx, ry, rgb)
+        gfxdraw.aaellipse(surface, center_x, center_y, rx, ry, rgb)
+        stem_x = center_x + rx - 2
+        stem_y_top = center_y - ry + 4
+        for offset in range(stem_width):
+            pygame.draw.aaline(surface, rgb,
+                               (stem_x + offset, stem_y_top),
+                               (stem_x + offset, stem_y_top - stem_height))
+
+        # Прозрачность применяем ко всему спрайту сразу, чтобы перекрытия
+        # головки и штиля не становились темнее
+        if alpha < 255:
+            surface.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+        return surface, (-center_x, -center_y)
+
+
+class LayerCache:
+    """Кэш статичных слоёв интерфейса (кнопки, шестерёнка, окружности кольца).
+
+    Каждый слой живёт в своём слоте и перерисовывается только когда меняется
+    его ключ - всё, от чего зависит картинка (текст, цвета, размер).
+    Слои непрозрачные с цветовым ключом: gfxdraw-сглаживание на SRCALPHA
+    затирало бы альфу под краями, а так результат совпадает с рисованием
+    прямо на экран.
+    """
+
+    def __init__(self):
+        self._layers = {}
+
+    def get(self, slot, key, size, render):
+        """Возвращает поверхность слоя; render(surface) вызывается только при смене ключа"""
+        entry = self._layers.get(slot)
+        if entry is None or entry[0] != key:
+            surface = pygame.Surface(size)
+            surface.fill(LAYER_COLORKEY)
+            render(surface)
+            surface.set_colorkey(LAYER_COLORKEY, pygame.RLEACCEL)
+            entry = self._layers[slot] = (key, surface)
+        return entry[1]
+
+    def invalidate(self, slot=None):
+        """Сбрасывает один слот или весь кэш"""
+        if slot is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(slot, None)
+
+
+class ProgressRing:
+    """Кольцо прогресса, которое дорисовывается по кусочкам.
+
+    Дуга хранится на собственной поверхности вместе с белым диском под ней.
+    Когда прогресс растёт, дорисовывается только новый сектор между прошлым
+    и текущим углом; полностью кольцо перерисовывается лишь при смене цвета
+    или уменьшении прогресса (сброс, смена режима). Точки дуги берутся из
+    заранее посчитанной таблицы синусов/косинусов с шагом 1°.
+    """
+
+    def __init__(self, radius, disc_radius, disc_color, border_color):
+        self.radius = radius
+        self.disc_radius = disc_radius
+        self.disc_color = disc_color
+        self.border_color = border_color
+        self._offset = disc_radius + 1
+        side = 2 * disc_radius + 2
+        self.surface = pygame.Surface((side, side))
+        self.surface.set_colorkey(LAYER_COLORKEY)
+
+        # Таблица точек дуги: угол a (в градусах от начала дуги) ->
+        # (sin, -cos) от (a - 90), как у исходного полигона
+        self._table = []
+        for degree in range(361):
+            rad = math.radians(degree - 90)
+            self._table.append((self._offset + radius * math.sin(rad),
+                                self._offset - radius * math.cos(rad)))
+
+        self.color = None
+        self.angle = 0.0
+        self._clear()
+
+    def _point(self, angle):
+        whole = int(angle)
+        if whole == angle:
+            return self._table[whole]
+        rad = math.radians(angle - 90)
+        return (self._offset + self.radius * math.sin(rad),
+                self._offset - self.radius * math.cos(rad))
+
+    def _clear(self):
+        self.surface.fill(LAYER_COLORKEY)
+        center = (self._offset, self._offset)
+        pygame.draw.circle(self.surface, self.disc_color, center, self.disc_radius)
+        pygame.draw.circle(self.surface, self.border_color, center, self.disc_radius, 2)
+        self.angle = 0.0
+
+    def _draw_wedge(self, start, end, color):
+        points = [(self._offset, self._offset), self._point(start)]
+        points.extend(self._table[degree] for degree in range(int(start) + 1, int(math.ceil(end))))
+        points.append(self._point(end))
+        if len(points) < 3:
+            return
+        gfxdraw.filled_polygon(self.surface, points, color)
+        gfxdraw.aapolygon(self.surface, points, color)
+
+    def update(self, progress, color):
+        """Приводит дугу к прогрессу progress (0..1); возвращает True, если она изменилась"""
+        angle = 360.0 * min(1.0, max(0.0, progress))
+        if color != self.color or angle < self.angle:
+            self.color = color
+            self._clear()
+        if angle <= self.angle:
+            return False
+        self._draw_wedge(self.angle, angle, color)
+        self.angle = angle
+        return True
+
+    def draw(self, screen, center):
+        """Блитит кольцо с центром в center и возвращает занятый прямоугольник"""
+        return screen.blit(self.surface, (center[0] - self._offset, center[1] - self._offset))
+
+
+class TextCache:
+    """LRU-кэш отрендеренных надписей.
+
+    Ключ - (шрифт, текст, цвет, сглаживание); при переполнении вытесняется
+    надпись, которая дольше всех не использовалась.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """То же, что font.render(text, antialias, color), но с кэшем"""
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, antialias, color)
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+class GlyphAtlas:
+    """Заранее отрендеренные глифы для часто меняющихся строк (цифры таймера).
+
+    Каждый символ растеризуется один раз; строка собирается из глифов
+    блитами прямо на экран, без промежуточной поверхности. Расстояние между
+    соседними символами берётся из таблицы пар, поэтому кернинг шрифта
+    сохраняется.
+    """
+
+    def __init__(self, font, color, chars="0123456789:"):
+        self._glyphs = {ch: font.render(ch, True, color) for ch in chars}
+        self._advance = {}
+        for first in chars:
+            for second in chars:
+                self._advance[first, second] = font.size(first + second)[0] - font.size(second)[0]
+        self.height = max(glyph.get_height() for glyph in self._glyphs.values())
+
+    def size(self, text):
+        """Размер строки text в пикселях"""
+        if not text:
+            return 0, self.height
+        advance = self._advance
+        width = sum(advance[text[i], text[i + 1]] for i in range(len(text) - 1))
+        return width + self._glyphs[text[-1]].get_width(), self.height
+
+    def draw(self, screen, text, center):
+        """Рисует text с центром в center и возвращает занятый прямоугольник"""
+        rect = pygame.Rect((0, 0), self.size(text))
+        rect.center = center
+        x = rect.x
+        batch = []
+        for i, ch in enumerate(text):
+            batch.append((self._glyphs[ch], (x, rect.y)))
+            if i + 1 < len(text):
+                x += self._advance[ch, text[i + 1]]
+        screen.blits(batch, doreturn=False)
+        return rect
@@ -0,0 +1,91 @@
+"""
+Адаптивный планировщик кадров главного цикла.
+
+Полная частота кадров нужна только пока что-то анимируется. В простое цикл
+засыпает в pygame.event.wait() и просыпается по событиям или по таймеру раз
+в секунду, а пока окно скрыто или свёрнуто, отрисовка не выполняется вовсе.
+"""
+
+import pygame
+
+ACTIVE_FPS = 60  # Частота кадров во время анимации
+WAKE_INTERVAL_MS = 1000  # Период пробуждений в простое
+INPUT_IDLE_TIMEOUT_MS = 30000  # Через сколько после последнего ввода анимация засыпает
+
+# Событие-будильник для простоя
+WAKE_EVENT = pygame.event.custom_type()
+
+# Режимы планировщика
+ACTIVE = 'active'  # анимация: ACTIVE_FPS
+SLEEP = 'sleep'  # ожидание событий с пробуждением раз в секунду
+
+_INPUT_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                 pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.KEYUP)
+
+
+class FrameScheduler:
+    """Решает, как долго ждать следующего кадра и нужно ли его рисовать"""
+
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+        self.visible = True
+        self.focused = True
+        self.mode = ACTIVE
+        self._last_input = pygame.time.get_ticks()
+        self._wake_in = None
+        self._wake_armed = False
+
+    def observe(self, event):
+        """Учитывает событие окна или ввода"""
+        if event.type in _INPUT_EVENTS:
+            self._last_input = pygame.time.get_ticks()
+        elif event.type in (pygame.WINDOWHIDDEN, pygame.WINDOWMINIMIZED):
+            self.visible = False
+        elif event.type in (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWEXPOSED):
+            self.visible = True
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+            self._last_input = pygame.time.get_ticks()
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+
+    def recent_input(self):
+        """Был ли ввод за последние INPUT_IDLE_TIMEOUT_MS"""
+        return pygame.time.get_ticks() - self._last_input < INPUT_IDLE_TIMEOUT_MS
+
+    def should_render(self):
+        """Нужно ли рисовать кадр (в скрытом окне - нет)"""
+        return self.visible
+
+    def choose(self, animating, wake_in=None):
+        """Выбирает режим следующего ожидания.
+
+        animating - на экране идёт анимация; wake_in - через сколько секунд
+        нужно проснуться в простое (например, к смене цифр таймера), по
+        умолчанию - через WAKE_INTERVAL_MS.
+        """
+        self._wake_in = wake_in
+        if animating and self.visible and self.focused:
+            self.mode = ACTIVE
+        else:
+            self.mode = SLEEP
+        return self.mode
+
+    def wait(self):
+        """Ждёт следующего кадра в текущем режиме и возвращает накопившиеся события"""
+        if self.mode == SLEEP:
+            # Будильник перезаводится перед каждым сном: ранние события его сдвигают
+            delay_ms = WAKE_INTERVAL_MS if self._wake_in is None else int(self._wake_in * 1000) + 1
+            pygame.time.set_timer(WAKE_EVENT, max(1, min(delay_ms, WAKE_INTERVAL_MS)), 1)
+            self._wake_armed = True
+            events = [pygame.event.wait()]
+            events.extend(pygame.event.get())
+            # Сбрасываем отсчёт Clock, чтобы после сна не было огромного кадра
+            self.clock.tick()
+            return events
+
+        if self._wake_armed:
+            pygame.time.set_timer(WAKE_EVENT, 0)
+            self._wake_armed = False
+        self.clock.tick(ACTIVE_FPS)
+        return pygame.event.get()
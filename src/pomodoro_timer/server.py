@@ -0,0 +1,333 @@
+"""
+Сервер таймеров Pomodoro для нескольких пользователей.
+
+Один процесс asyncio ведёт много сессий, каждая - TimerCore (работа,
+короткий перерыв, длинный перерыв после каждой 4-й сессии). Сессии не
+опрашиваются: дедлайны идущих фаз лежат в куче (heapq), и цикл событий
+просыпается ровно к ближайшему из них через loop.call_later(). Пауза,
+сброс и удаление не ищут запись в куче, а увеличивают поколение сессии -
+устаревшие записи просто пропускаются при извлечении.
+
+Протокол - JSON по строке на сообщение через TCP на localhost или Unix-сокет.
+Запрос: {"id": 1, "cmd": "create", "work": 1500, "short_break": 300,
+"long_break": 900, "start": true}; ответ: {"id": 1, "ok": true, ...}.
+Команды: create, start, pause, reset, status, subscribe, delete, stats.
+Соединение, создавшее сессию, подписано на её события:
+{"event": "phase-complete", "session": 7, "phase": "work",
+"session_count": 1, "late_ms": 0.4, "time": <unix time>} и "long-break".
+Как и в приложении, новая фаза начинается на паузе (команда start).
+Посекундных тиков сервер не рассылает - остаток даёт команда status.
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import math
+import os
+import time
+
+from .core import TICK, TimerCore
+from .timekeeping import monotonic_clock
+
+DEFAULT_ADDRESS = '127.0.0.1:7345'
+# Длительности фаз по умолчанию, секунды (как в настройках приложения)
+DEFAULT_DURATIONS = {'work': 25 * 60, 'short_break': 5 * 60, 'long_break': 15 * 60}
+MAX_PHASE_SECONDS = 24 * 60 * 60  # Больше суток фаза не бывает
+# Куча перестраивается, когда устаревших записей больше живых во столько раз
+COMPACT_RATIO = 2
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """Некорректный запрос клиента"""
+
+
+class Session:
+    """Сессия сервера: ядро таймера и поколение её записи в куче дедлайнов"""
+
+    __slots__ = ('core', 'generation', 'scheduled', 'subscribers')
+
+    def __init__(self, core):
+        self.core = core
+        self.generation = 0
+        self.scheduled = False  # Есть ли в куче актуальная запись
+        self.subscribers = None  # set соединений или None
+
+
+class TimerService:
+    """Сессии и планировщик дедлайнов на куче; ввода-вывода здесь нет.
+
+    notify(session_id, session, event, late) вызывается на каждое событие
+    смены фазы; late - на сколько секунд уведомление опоздало к дедлайну.
+    """
+
+    def __init__(self, notify, clock=None, loop=None):
+        self.notify = notify
+        self.clock = clock or monotonic_clock
+        self.loop = loop or asyncio.get_running_loop()
+        self.sessions = {}
+        self._next_id = 1
+        self._heap = []  # (дедлайн, поколение, id сессии)
+        self._stale = 0  # Устаревшие записи в куче
+        self._handle = None  # Таймер цикла событий на ближайший дедлайн
+        self._armed_at = None
+
+    def create(self, work, short_break, long_break):
+        session_id = self._next_id
+        self._next_id += 1
+        self.sessions[session_id] = Session(TimerCore(work, short_break, long_break, clock=self.clock))
+        return session_id
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id) if isinstance(session_id, int) else None
+        if session is None:
+            raise ProtocolError(f"нет сессии {session_id}")
+        return session
+
+    def _invalidate(self, session):
+        """Делает запись сессии в куче устаревшей"""
+        session.generation += 1
+        if session.scheduled:
+            session.scheduled = False
+            self._stale += 1
+
+    def _schedule(self, session_id, session):
+        deadline = session.core.deadline()
+        if deadline is None:
+            return
+        heapq.heappush(self._heap, (deadline, session.generation, session_id))
+        session.scheduled = True
+        self._arm()
+
+    def start(self, session_id):
+        session = self.get(session_id)
+        if not session.core.is_running:
+            session.core.start()
+            self._invalidate(session)
+            self._schedule(session_id, session)
+
+    def pause(self, session_id):
+        session = self.get(session_id)
+        session.core.pause()
+        self._invalidate(session)
+
+    def reset(self, session_id):
+        session = self.get(session_id)
+        session.core.reset()
+        self._invalidate(session)
+
+    def delete(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self._invalidate(session)
+        return session
+
+    def _arm(self):
+        """Заводит таймер цикла событий на ближайший дедлайн, если он раньше заведённого"""
+        heap = self._heap
+        if not heap:
+            return
+        deadline = heap[0][0]
+        if self._handle is not None:
+            if deadline >= self._armed_at:
+                return
+            self._handle.cancel()
+        self._armed_at = deadline
+        self._handle = self.loop.call_later(max(0.0, deadline - self.clock()), self._fire)
+
+    def _fire(self):
+        """Обрабатывает все наступившие дедлайны"""
+        self._handle = None
+        heap = self._heap
+        now = self.clock()
+        while heap and heap[0][0] <= now:
+            deadline, generation, session_id = heapq.heappop(heap)
+            session = self.sessions.get(session_id)
+            if session is None or session.generation != generation:
+                self._stale -= 1
+                continue
+            session.scheduled = False
+            events = session.core.update()
+            if session.core.is_running:
+                # Дедлайн по куче наступил чуть раньше, чем по отсчёту (округление)
+                self._schedule(session_id, session)
+                continue
+            for event in events:
+                if event.kind != TICK:
+                    self.notify(session_id, session, event, now - deadline)
+        if self._stale > COMPACT_RATIO * (len(heap) - self._stale) + 1024:
+            self._compact()
+        self._arm()
+
+    def _compact(self):
+        """Выбрасывает из кучи устаревшие записи"""
+        sessions = self.sessions
+        self._heap = [entry for entry in self._heap
+                      if entry[2] in sessions and sessions[entry[2]].generation == entry[1]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def stats(self):
+        running = sum(1 for session in self.sessions.values() if session.core.is_running)
+        return {'sessions': len(self.sessions), 'running': running, 'heap': len(self._heap)}
+
+
+def status(session_id, session):
+    core = session.core
+    return {'session': session_id, 'phase': core.phase, 'running': core.is_running,
+            'session_count': core.session_count, 'remaining': core.countdown.remaining()}
+
+
+def _encode(message):
+    return (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class SessionServer:
+    """JSON-протокол поверх TimerService"""
+
+    def __init__(self, clock=None):
+        self.service = TimerService(self._notify, clock)
+
+    def _notify(self, session_id, session, event, late):
+        if not session.subscribers:
+            return
+        line = _encode({'event': event.kind, 'session': session_id, 'phase': event.phase,
+                        'session_count': event.session_count,
+                        'late_ms': round(late * 1000, 3), 'time': time.time()})
+        for writer in session.subscribers:
+            # Без drain(): уведомления не должны ждать медленного клиента
+            writer.write(line)
+
+    def _subscribe(self, session_id, session, writer, subscriptions):
+        if session.subscribers is None:
+            session.subscribers = set()
+        session.subscribers.add(writer)
+        subscriptions.add(session_id)
+
+    def _durations(self, request):
+        durations = []
+        for key, default in DEFAULT_DURATIONS.items():
+            value = request.get(key, default)
+            if (isinstance(value, bool) or not isinstance(value, (int, float))
+                    or not math.isfinite(value) or not 0 < value <= MAX_PHASE_SECONDS):
+                raise ProtocolError(f"{key}: нужна длительность в секундах, от 0 до {MAX_PHASE_SECONDS}")
+            durations.append(value)
+        return durations
+
+    def handle(self, request, writer, subscriptions):
+        """Выполняет запрос и возвращает поля ответа"""
+        service = self.service
+        command = request.get('cmd')
+        if command == 'create':
+            session_id = service.create(*self._durations(request))
+            session = service.sessions[session_id]
+            self._subscribe(session_id, session, writer, subscriptions)
+            if request.get('start'):
+                service.start(session_id)
+            return status(session_id, session)
+        if command == 'stats':
+            return service.stats()
+        session_id = request.get('session')
+        if command == 'start':
+            service.start(session_id)
+        elif command == 'pause':
+            service.pause(session_id)
+        elif command == 'reset':
+            service.reset(session_id)
+        elif command == 'subscribe':
+            self._subscribe(session_id, service.get(session_id), writer, subscriptions)
+        elif command == 'delete':
+            service.get(session_id)
+            service.delete(session_id)
+            subscriptions.discard(session_id)
+            return {'session': session_id}
+        elif command != 'status':
+            raise ProtocolError(f"неизвестная команда {command!r}")
+        return status(session_id, service.get(session_id))
+
+    async def handle_client(self, reader, writer):
+        subscriptions = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # слишком длинная строка или обрыв
+                    break
+                if not line:
+                    break
+                request = {}
+                try:
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        raise ProtocolError(f"некорректный JSON: {e}")
+                    if not isinstance(request, dict):
+                        request = {}
+                        raise ProtocolError("ожидается JSON-объект")
+                    reply = {'ok': True}
+                    reply.update(self.handle(request, writer, subscriptions))
+                except ProtocolError as e:
+                    reply = {'ok': False, 'error': str(e)}
+                except Exception as e:
+                    # Один сломанный запрос не должен рвать соединение
+                    print(f"⚠️  Ошибка обработки запроса {request.get('cmd')!r}: {e!r}")
+                    reply = {'ok': False, 'error': "внутренняя ошибка сервера"}
+                if 'id' in request:
+                    reply['id'] = request['id']
+                writer.write(_encode(reply))
+                await writer.drain()
+        finally:
+            sessions = self.service.sessions
+            for session_id in subscriptions:
+                session = sessions.get(session_id)
+                if session is not None and session.subscribers:
+                    session.subscribers.discard(writer)
+            writer.close()
+
+
+def parse_address(address):
+    """'host:port' -> ('tcp', host, port); иначе путь к Unix-сокету -> ('unix', path, None)"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return 'tcp', host or '127.0.0.1', int(port)
+    return 'unix', address, None
+
+
+async def start_server(address=DEFAULT_ADDRESS):
+    """Запускает сервер и возвращает (asyncio.Server, SessionServer)"""
+    sessions = SessionServer()
+    kind, host, port = parse_address(address)
+    if kind == 'tcp':
+        server = await asyncio.start_server(sessions.handle_client, host, port, limit=MAX_LINE_BYTES)
+    else:
+        if os.path.exists(host):
+            os.remove(host)  # сокет от предыдущего запуска
+        server = await asyncio.start_unix_server(sessions.handle_client, host, limit=MAX_LINE_BYTES)
+    return server, sessions
+
+
+async def _serve_forever(address):
+    server, _ = await start_server(address)
+    print(f"✓ Сервер таймеров слушает {address}")
+    async with server:
+        await server.serve_forever()
+
+
+def serve(address=DEFAULT_ADDRESS):
+    """Запускает сервер и работает до Ctrl+C"""
+    try:
+        asyncio.run(_serve_forever(address))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pomodoro-server", description="Сервер таймеров Pomodoro")
+    parser.add_argument('address', nargs='?', default=DEFAULT_ADDRESS,
+                        help=f"host:port или путь к Unix-сокету (по умолчанию {DEFAULT_ADDRESS})")
+    serve(parser.parse_args(argv).address)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Синтез звуков целыми буферами.
+
+Небольшой набор строительных блоков - временная шкала, синусоидальный
+осциллятор, экспоненциальные и линейные огибающие, шум, смешивание - которые
+работают сразу с целым буфером отсчётов. С NumPy это векторные операции над
+массивами float64, без него - модуль array и генераторы списков (медленнее,
+но без внешних зависимостей).
+
+Модуль не зависит от pygame, поэтому им пользуются и скрипты генерации
+звуков в scripts/.
+"""
+
+import math
+import random
+import sys
+import wave
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+SAMPLE_RATE = 44100
+CHUNK_SAMPLES = 8192  # Размер блока при потоковой генерации
+
+# Форматы отсчётов в терминах pygame.mixer.get_init(): знак - знаковость,
+# модуль - разрядность; 32 - float32
+_NUMPY_FORMATS = {-8: 'int8', 8: 'uint8', -16: 'int16', 16: 'uint16', 32: 'float32'}
+_ARRAY_FORMATS = {-8: 'b', 8: 'B', -16: 'h', 16: 'H', 32: 'f'}
+
+
+def num_samples(duration, sample_rate=SAMPLE_RATE):
+    """Количество отсчётов в duration секундах"""
+    return int(sample_rate * duration)
+
+
+def timeline(count, sample_rate=SAMPLE_RATE, start=0):
+    """Моменты времени (в секундах) отсчётов start .. start + count - 1"""
+    if np is not None:
+        return (np.arange(count, dtype=np.float64) + start) / sample_rate
+    return array('d', [(start + i) / sample_rate for i in range(count)])
+
+
+def sine(frequency, t, phase=0.0):
+    """Синусоида частоты frequency (Гц) в моменты t"""
+    w = 2 * math.pi * frequency
+    if np is not None:
+        return np.sin(w * t + phase)
+    sin = math.sin
+    return array('d', [sin(w * x + phase) for x in t])
+
+
+def exp_envelope(tau, t):
+    """Экспоненциальное затухание exp(-t / tau)"""
+    if np is not None:
+        return np.exp(-t / tau)
+    exp = math.exp
+    return array('d', [exp(-x / tau) for x in t])
+
+
+def release_envelope(count, release=0.2, start=0, total=None):
+    """Огибающая: 1.0, а на последней доле release - линейное затухание до нуля.
+
+    total - длина всей ноты в отсчётах (по умолчанию count); start и count
+    позволяют получить кусок огибающей при потоковой генерации.
+    """
+    total = count if total is None else total
+    knee = 1.0 - release
+    if np is not None:
+        progress = (np.arange(count, dtype=np.float64) + start) / total
+        return np.where(progress > knee, 1.0 - (progress - knee) / release, 1.0)
+    return array('d', [1.0 - ((start + i) / total - knee) / release
+                       if (start + i) / total > knee else 1.0
+                       for i in range(count)])
+
+
+def blocks(count, chunk=CHUNK_SAMPLES):
+    """Разбивает count отсчётов на блоки: пары (start, length)"""
+    for start in range(0, count, chunk):
+        yield start, min(chunk, count - start)
+
+
+def noise(count, seed=None):
+    """Белый шум в диапазоне [-1, 1)"""
+    rng = random.Random(seed) if seed is not None else random
+    if np is not None:
+        # Случайные биты берём у random и переводим в [0, 1) векторно:
+        # ленивый импорт numpy.random стоил бы ~20 мс на старте. Байты те же,
+        # что дал бы randbytes(), но он появился только в Python 3.9
+        data = rng.getrandbits(64 * count).to_bytes(8 * count, 'little') if count else b''
+        bits = np.frombuffer(data, dtype='<u8')
+        return (bits >> np.uint64(11)) * (2.0 ** -52) - 1.0
+    return array('d', [rng.random() * 2 - 1 for _ in range(count)])
+
+
+def multiply(*signals):
+    """Поэлементное произведение сигналов (например, осциллятор * огибающая)"""
+    result = signals[0]
+    for signal in signals[1:]:
+        if np is not None:
+            result = result * signal
+        else:
+            result = array('d', [a * b for a, b in zip(result, signal)])
+    return result
+
+
+def mix(*components, offset=0.0):
+    """Смешивает пары (gain, signal) и добавляет постоянную offset"""
+    if np is not None:
+        result = offset
+        for gain, signal in components:
+            result = result + gain * signal
+        return result
+    count = len(components[0][1])
+    result = array('d', [offset]) * count
+    for gain, signal in components:
+        result = array('d', [acc + gain * x for acc, x in zip(result, signal)])
+    return result
+
+
+def concat(*signals):
+    """Склеивает сигналы один за другим"""
+    if np is not None:
+        return np.concatenate(signals)
+    result = array('d')
+    for signal in signals:
+        result.extend(signal)
+    return result
+
+
+def silence(count):
+    """Тишина из count отсчётов"""
+    if np is not None:
+        return np.zeros(count, dtype=np.float64)
+    return array('d', [0.0]) * count
+
+
+def sequence(count, events):
+    """Раскладывает звуки по времени в буфер из count отсчётов.
+
+    events - тройки (offset, gain, signal): signal с громкостью gain
+    начинается с отсчёта offset; хвосты за концом буфера обрезаются.
+    """
+    result = silence(count)
+    for offset, gain, signal in events:
+        length = max(0, min(len(signal), count - offset))
+        if np is not None:
+            result[offset:offset + length] += gain * signal[:length]
+        else:
+            for i in range(length):
+                result[offset + i] += gain * signal[i]
+    return result
+
+
+def encode(signal, size=-16, channels=1):
+    """Переводит сигнал [-1, 1] в сырые PCM-байты.
+
+    size - формат отсчёта как в pygame.mixer.get_init() (-16 - знаковые
+    16 бит и т.д.), channels - число каналов: моно-сигнал копируется в каждый.
+    Значения ограничиваются диапазоном [-1, 1]; целые форматы, как и раньше,
+    отбрасывают дробную часть.
+    """
+    if size not in _NUMPY_FORMATS:
+        raise ValueError(f"Неподдерживаемый формат отсчётов: {size}")
+    bits = abs(size) if size != 32 else 0
+    scale = (1 << (bits - 1)) - 1 if bits else 1.0
+    unsigned_offset = (1 << (bits - 1)) if size > 0 and bits else 0
+
+    if np is not None:
+        clipped = np.clip(np.asarray(signal, dtype=np.float64), -1.0, 1.0)
+        if bits:
+            values = (clipped * scale).astype(np.int32) + unsigned_offset
+        else:
+            values = clipped
+        values = values.astype(_NUMPY_FORMATS[size])
+        if channels > 1:
+            values = np.repeat(values, channels)
+        return values.astype(values.dtype.newbyteorder('<')).tobytes()
+
+    if bits:
+        values = [int(max(-1.0, min(1.0, x)) * scale) + unsigned_offset for x in signal]
+    else:
+        values = [max(-1.0, min(1.0, x)) for x in signal]
+    samples = array(_ARRAY_FORMATS[size], values)
+    if channels > 1:
+        samples = array(samples.typecode, [v for v in samples for _ in range(channels)])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def write_wav(path, chunks, sample_rate=SAMPLE_RATE, channels=1):
+    """Потоково пишет 16-битный WAV из последовательности кусков сигнала.
+
+    chunks - итерируемое (обычно генератор) кусков; каждый кодируется и
+    сразу уходит в файл, так что память не зависит от длительности.
+    Возвращает число записанных кадров.
+    """
+    frames = 0
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for chunk in chunks:
+            wav_file.writeframes(encode(chunk, -16, channels))
+            frames += len(chunk)
+    return frames
+
+
+def render_tick(sample_rate=SAMPLE_RATE, seed=None, pitch=1.0):
+    """Короткий «тик» метронома (~80 мс): щелчок + деревянное тело + шум.
+
+    pitch - множитель частот (акцентный тик звучит выше)
+    """
+    t = timeline(num_samples(0.08, sample_rate), sample_rate)
+    # Короткая высокочастотная атака (похожа на механический щелчок), 4 мс затухание
+    transient = multiply(sine(3500.0 * pitch, t), exp_envelope(0.004, t))
+    # Низкая «деревянная» составляющая, 18 мс
+    body = multiply(sine(650.0 * pitch, t), exp_envelope(0.018, t))
+    # Шумовая составляющая (узкий щелчок с затуханием), 10 мс
+    click = multiply(noise(len(t), seed), exp_envelope(0.010, t))
+    # Смешиваем компоненты для «часового тика» и приглушаем
+    return mix((0.55 * 0.7, transient), (0.25 * 0.7, body), (0.20 * 0.7, click))
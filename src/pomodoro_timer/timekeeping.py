@@ -0,0 +1,77 @@
+"""
+Отсчёт времени без дрейфа.
+
+Countdown хранит не «сколько осталось», а момент окончания по монотонным
+часам и каждый раз вычисляет остаток заново. Поэтому задержки кадров не
+накапливаются, долгий подвис или сон системы засчитываются целиком, а
+перевод системных часов не влияет на таймер. Часы можно подменить
+(clock=...), что удобно в тестах.
+"""
+
+import math
+import time
+
+
+if hasattr(time, 'CLOCK_BOOTTIME'):
+    def monotonic_clock():
+        """Монотонные часы в секундах, которые идут и во время сна системы.
+
+        В отличие от time.monotonic() на Linux, CLOCK_BOOTTIME учитывает время
+        сна, так что таймер корректно «догоняет» его после пробуждения.
+        """
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+else:
+    monotonic_clock = time.monotonic
+
+
+class Countdown:
+    """Обратный отсчёт с паузой, основанный на фиксированном дедлайне"""
+
+    __slots__ = ('clock', 'duration', '_remaining', '_deadline')
+
+    def __init__(self, duration, clock=None):
+        self.clock = clock or monotonic_clock
+        self.duration = duration
+        self._remaining = float(duration)  # Остаток на момент паузы
+        self._deadline = None  # Момент окончания, пока отсчёт идёт
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    def start(self):
+        """Запускает или продолжает отсчёт"""
+        if self._deadline is None:
+            self._deadline = self.clock() + self._remaining
+
+    def pause(self):
+        """Останавливает отсчёт, запоминая остаток"""
+        if self._deadline is not None:
+            self._remaining = max(0.0, self._deadline - self.clock())
+            self._deadline = None
+
+    def reset(self, duration=None):
+        """Останавливает отсчёт и начинает его заново (с новой длительностью)"""
+        if duration is not None:
+            self.duration = duration
+        self._remaining = float(self.duration)
+        self._deadline = None
+
+    def set_remaining(self, seconds):
+        """Устанавливает остаток, не меняя состояние паузы"""
+        self._remaining = float(seconds)
+        if self._deadline is not None:
+            self._deadline = self.clock() + self._remaining
+
+    def remaining(self):
+        """Точный остаток в секундах (не меньше нуля)"""
+        if self._deadline is None:
+            return self._remaining
+        return max(0.0, self._deadline - self.clock())
+
+    def remaining_seconds(self):
+        """Остаток в целых секундах с округлением вверх - для отображения"""
+        return int(math.ceil(self.remaining() - 1e-9))
+
+    def expired(self):
+        return self.remaining() <= 0.0
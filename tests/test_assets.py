@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Печатает, где нашлись ресурсы установленного пакета
+LOCATE = """
+from pomodoro_timer.assets import AssetManager
+from pomodoro_timer.pomodoro import ALARM_SOUNDS
+assets = AssetManager()
+for parts in ALARM_SOUNDS + (('icon.png',),):
+    print(assets.locate(*parts))
+"""
+
+
+def _env(**extra):
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    env.pop('PYTHONPATH', None)  # Пакет берётся только из site
+    env.update(extra)
+    return env
+
+
+def test_resources_resolve_inside_installed_package(tmp_path):
+    pytest.importorskip('setuptools')
+    site = tmp_path / 'site-packages'
+    # Та же раскладка, что у установленного пакета: модули и package-data,
+    # без дерева исходников рядом (egg-info - тоже во временный каталог)
+    egg_base = tmp_path / 'egg'
+    egg_base.mkdir()
+    build = subprocess.run([sys.executable, 'setup.py', '-q', 'egg_info', '--egg-base', str(egg_base),
+                            'build_py', '--build-lib', str(site)],
+                           cwd=ROOT, env=_env(), capture_output=True, text=True, timeout=120)
+    assert build.returncode == 0, build.stderr
+    result = subprocess.run([sys.executable, '-c', LOCATE], cwd=str(tmp_path),
+                            env=_env(PYTHONPATH=str(site)), capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    located = result.stdout.split()
+    package_resources = os.path.join(str(site), 'pomodoro_timer', 'resources')
+    assert len(located) == 3
+    for path in located:
+        assert path.startswith(package_resources), path
+        assert os.path.isfile(path)
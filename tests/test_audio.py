@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from pomodoro_timer.audio import AUDIO_DEFAULTS, read_audio_settings, validate_audio_settings
+
+
+def test_valid_values_are_kept():
+    data = {'audio_frequency': 48000, 'audio_channels': 1, 'audio_buffer': 1024}
+    assert validate_audio_settings(data) == data
+
+
+@pytest.mark.parametrize('key, value', [
+    ('audio_channels', True),  # True == 1
+    ('audio_frequency', 44100.0),
+    ('audio_buffer', 500),
+    ('audio_buffer', '512'),
+])
+def test_invalid_values_fall_back_to_defaults(key, value):
+    assert validate_audio_settings({key: value}) == AUDIO_DEFAULTS
+
+
+@pytest.mark.parametrize('content', ['[]', 'null', '42', '"text"', '{broken', ''])
+def test_non_object_settings_file_gives_defaults(tmp_path, content):
+    path = tmp_path / 'settings.json'
+    path.write_text(content)
+    assert read_audio_settings(str(path)) == AUDIO_DEFAULTS
+
+
+def test_missing_file_gives_defaults(tmp_path):
+    assert read_audio_settings(str(tmp_path / 'missing.json')) == AUDIO_DEFAULTS
+
+
+def test_settings_file_values_are_read(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({'work_time': 25, 'audio_buffer': 256}))
+    assert read_audio_settings(str(path)) == dict(AUDIO_DEFAULTS, audio_buffer=256)
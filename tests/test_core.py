@@ -0,0 +1,140 @@
+from pomodoro_timer.core import (LONG_BREAK, LONG_BREAK_PHASE, PHASE_ABORTED, PHASE_COMPLETE,
+                                 SHORT_BREAK, TICK, WORK, TimerCore)
+from pomodoro_timer.timekeeping import Countdown
+
+
+class FakeClock:
+    """Часы, которые идут только по команде"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _kinds(events):
+    return [event.kind for event in events]
+
+
+def _finish_phase(core, clock):
+    core.start()
+    clock.advance(core.countdown.remaining())
+    return core.update()
+
+
+def test_countdown_pause_and_resume():
+    clock = FakeClock()
+    countdown = Countdown(10, clock)
+    countdown.start()
+    clock.advance(3.5)
+    assert countdown.remaining() == 6.5
+    assert countdown.remaining_seconds() == 7
+    countdown.pause()
+    clock.advance(100)  # На паузе время не уходит
+    assert countdown.remaining() == 6.5
+    countdown.start()
+    clock.advance(6.5)
+    assert countdown.expired()
+    assert countdown.remaining() == 0.0
+
+
+def test_ticks_once_per_displayed_second():
+    clock = FakeClock()
+    core = TimerCore(3, 1, 2, clock=clock)
+    assert core.update() == ()  # Стоит - событий нет
+    assert core.seconds_until_tick() is None
+    core.start()
+    clock.advance(0.4)
+    assert core.update() == ()  # На экране всё ещё 3
+    assert abs(core.seconds_until_tick() - 0.6) < 1e-9
+    clock.advance(0.6)
+    (tick,) = core.update()
+    assert (tick.kind, tick.phase, tick.remaining, tick.duration) == (TICK, WORK, 2, 3)
+    assert core.update() == ()
+    clock.advance(1.0)
+    assert [event.remaining for event in core.update()] == [1]
+
+
+def test_phase_cycle_with_long_break_every_fourth_session():
+    clock = FakeClock()
+    core = TimerCore(25, 5, 15, clock=clock)
+    phases = []
+    for _ in range(8):
+        events = _finish_phase(core, clock)
+        complete = events[0]
+        assert complete.kind == PHASE_COMPLETE
+        phases.append(complete.phase)
+        if core.phase == LONG_BREAK_PHASE:
+            assert _kinds(events) == [PHASE_COMPLETE, LONG_BREAK]
+            assert events[1].duration == 15
+        else:
+            assert _kinds(events) == [PHASE_COMPLETE]
+        assert not core.is_running  # Новая фаза начинается на паузе
+        assert core.countdown.remaining() == core.phase_seconds()
+    assert phases == [WORK, SHORT_BREAK, WORK, SHORT_BREAK, WORK, SHORT_BREAK, WORK, LONG_BREAK_PHASE]
+    assert core.session_count == 4
+    assert core.phase == WORK
+
+
+def test_late_update_completes_phase_once():
+    clock = FakeClock()
+    core = TimerCore(10, 5, 15, clock=clock)
+    core.start()
+    clock.advance(60)  # Подвис или сон системы дольше фазы
+    assert _kinds(core.update()) == [PHASE_COMPLETE]
+    assert core.phase == SHORT_BREAK
+    assert core.update() == ()
+
+
+def test_reset_aborts_started_phase_only():
+    clock = FakeClock()
+    core = TimerCore(10, 5, 15, clock=clock)
+    assert core.reset() == ()  # Не начатая фаза не прерывается
+    core.start()
+    clock.advance(4)
+    core.pause()
+    (aborted,) = core.reset()
+    assert (aborted.kind, aborted.phase, aborted.remaining, aborted.duration) == (PHASE_ABORTED, WORK, 6, 10)
+    assert core.phase == WORK and core.session_count == 0
+    assert core.countdown.remaining() == 10
+
+
+def test_set_durations_applies_to_unstarted_phase_only():
+    clock = FakeClock()
+    core = TimerCore(10, 5, 15, clock=clock)
+    core.set_durations(20, 5, 15)
+    assert core.countdown.remaining() == 20
+    core.start()
+    clock.advance(5)
+    core.set_durations(30, 5, 15)
+    assert core.countdown.remaining() == 15  # Начатая фаза досчитывается как есть
+    _finish_phase(core, clock)
+    core.set_durations(30, 7, 15)
+    assert core.countdown.remaining() == 7
+
+
+def test_progress_stays_continuous_when_durations_change_mid_phase():
+    clock = FakeClock()
+    core = TimerCore(100, 5, 15, clock=clock)
+    core.start()
+    clock.advance(40)
+    before = core.progress()
+    core.set_durations(50, 5, 15)  # Фаза короче уже прошедшего
+    assert core.progress() == before == 0.4
+    assert core.phase_seconds() == 100
+    clock.advance(30)
+    assert core.progress() == 0.7
+    assert core.countdown.remaining() == 30
+    core.set_durations(1000, 5, 15)
+    clock.advance(30)
+    assert core.progress() == 1.0
+    (complete,) = core.update()
+    assert complete.duration == 100
+    # Следующие фазы идут уже по новым длительностям
+    _finish_phase(core, clock)
+    assert core.phase_seconds() == 1000
+    assert core.progress() == 0.0
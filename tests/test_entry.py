@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, 'run_pomodoro.py')
+
+
+def _run(args, home):
+    env = dict(os.environ, HOME=str(home), SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    env.pop('PYTHONPATH', None)  # Лаунчер должен найти пакет сам
+    # Запуск не из корня проекта, как у собранного приложения
+    return subprocess.run([sys.executable, LAUNCHER] + args, cwd=str(home), env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_launcher_runs_as_script(tmp_path):
+    result = _run(['--help'], tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert 'pomodoro-timer' in result.stdout
+
+
+def test_launcher_executes_main(tmp_path):
+    # --history проходит через main() без окна и звука
+    result = _run(['--history'], tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert 'Работа' in result.stdout
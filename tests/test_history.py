@@ -0,0 +1,97 @@
+import os
+import time
+
+from pomodoro_timer import history
+from pomodoro_timer.core import LONG_BREAK_PHASE, SHORT_BREAK, WORK
+from pomodoro_timer.history import HEADER, RECORD, HistoryLog, HistoryReader
+
+
+def _write(directory, records, **kwargs):
+    log = HistoryLog(str(directory), **kwargs)
+    for record in records:
+        log.append(*record)
+    log.close()
+
+
+def test_round_trip_and_summary(tmp_path):
+    _write(tmp_path, [
+        (1000.0, 2500.0, 1500.0, 1500.0, WORK, False, 1),
+        (2500.0, 2600.0, 300.0, 100.0, SHORT_BREAK, True, 1),
+    ])
+    records = list(HistoryReader(str(tmp_path)).records())
+    assert [(r.started_at, r.ended_at, r.phase, r.interrupted, r.session_count) for r in records] == [
+        (1000.0, 2500.0, WORK, False, 1),
+        (2500.0, 2600.0, SHORT_BREAK, True, 1),
+    ]
+    summary = HistoryReader(str(tmp_path)).summary()
+    assert summary[WORK] == [1, 0, 1500.0]
+    assert summary[SHORT_BREAK] == [0, 1, 100.0]
+    assert summary[LONG_BREAK_PHASE] == [0, 0, 0.0]
+    assert [r.ended_at for r in HistoryReader(str(tmp_path)).records(since=2550.0)] == [2600.0]
+
+
+def test_rotation_keeps_order(tmp_path):
+    limit = HEADER.size + 3 * RECORD.size
+    _write(tmp_path, [(float(i), float(i + 1), 1.0, 1.0, WORK, False, i) for i in range(8)],
+           max_file_bytes=limit)
+    files = sorted(os.listdir(tmp_path))
+    assert files == ['history-000001.bin', 'history-000002.bin', 'history-000003.bin']
+    assert [r.session_count for r in HistoryReader(str(tmp_path)).records()] == list(range(8))
+    # Старые файлы целиком раньше since пропускаются
+    assert [r.session_count for r in HistoryReader(str(tmp_path)).records(since=6.5)] == [6, 7]
+
+
+def test_torn_tail_is_skipped_and_truncated(tmp_path):
+    _write(tmp_path, [(1.0, 2.0, 1.0, 1.0, WORK, False, 1)])
+    path = tmp_path / 'history-000001.bin'
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (RECORD.size // 2))  # Запись оборвалась при падении
+    assert len(list(HistoryReader(str(tmp_path)).records())) == 1
+    _write(tmp_path, [(3.0, 4.0, 1.0, 1.0, WORK, False, 2)])
+    assert os.path.getsize(path) == HEADER.size + 2 * RECORD.size
+    assert [r.session_count for r in HistoryReader(str(tmp_path)).records()] == [1, 2]
+
+
+def test_write_error_closes_file_and_recovers(tmp_path, monkeypatch, capsys):
+    log = HistoryLog(str(tmp_path))
+    real_write = log._write
+    opened = []
+    failures = [True]
+
+    def flaky_write(data):
+        if log._file is not None:
+            opened.append(log._file)
+        if failures and log._file is not None:
+            failures.pop()
+            raise OSError("диск переполнен")
+        real_write(data)
+
+    monkeypatch.setattr(log, '_write', flaky_write)
+    for i in range(3):
+        log.append(float(i), float(i + 1), 1.0, 1.0, WORK, False, i)
+    log.close()
+    assert "Не удалось записать историю" in capsys.readouterr().out
+    assert opened and opened[0].closed  # Файл после ошибки закрыт, а не брошен
+    assert [r.session_count for r in HistoryReader(str(tmp_path)).records()] == [0, 2]
+
+
+def test_unknown_format_is_skipped(tmp_path, capsys):
+    (tmp_path / 'history-000001.bin').write_bytes(HEADER.pack(b'XXXX', history.FORMAT_VERSION, RECORD.size))
+    assert list(HistoryReader(str(tmp_path)).records()) == []
+    assert "неизвестный формат" in capsys.readouterr().out
+
+
+def test_close_waits_for_slow_write(tmp_path):
+    log = HistoryLog(str(tmp_path))
+    real_write = log._write
+
+    def slow_write(data):
+        time.sleep(0.3)  # Медленный диск: дольше, чем ждали бы с коротким таймаутом
+        real_write(data)
+
+    log._write = slow_write
+    for i in range(10):
+        log.append(float(i), float(i + 1), 1.0, 1.0, WORK, False, i)
+    log.close()
+    assert log._file is None
+    assert [r.session_count for r in HistoryReader(str(tmp_path)).records()] == list(range(10))
@@ -0,0 +1,84 @@
+import math
+import random
+
+import pytest
+
+from pomodoro_timer import particles
+from pomodoro_timer.particles import NoteField
+
+WIDTH, HEIGHT = 500, 560
+CELL_SIZE = 42  # Диаметр самой крупной ноты
+
+
+def _field(density, use_numpy, seed=1):
+    """Ноты как в приложении: 8 крупных и 18 мелких на единицу плотности"""
+    rng = random.Random(seed)
+    field = NoteField(WIDTH, HEIGHT, range(5), CELL_SIZE, use_numpy=use_numpy)
+    for count, size_range, speed in ((8 * density, (26, 42), 0.8), (18 * density, (12, 20), 1.0)):
+        for _ in range(count):
+            field.add(rng.uniform(30, WIDTH - 30), rng.uniform(30, HEIGHT - 30),
+                      rng.uniform(*size_range), rng.randrange(5),
+                      rng.uniform(-speed, speed), rng.uniform(-speed, speed))
+    field.pack()
+    return field
+
+
+def _full_scan(pairs, grid, x, y, vx, vy, radius):
+    """Исходный алгоритм: все пары по i и j без сетки"""
+    n = len(x)
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx = x[j] - x[i]
+            dy = y[j] - y[i]
+            distance = math.sqrt(dx * dx + dy * dy)
+            min_distance = radius[i] + radius[j]
+            if distance < min_distance and distance > 0:
+                nx = dx / distance
+                ny = dy / distance
+                overlap = min_distance - distance
+                x[i] -= nx * overlap * 0.5
+                y[i] -= ny * overlap * 0.5
+                x[j] += nx * overlap * 0.5
+                y[j] += ny * overlap * 0.5
+                if (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny < 0:
+                    speed1 = math.sqrt(vx[i]**2 + vy[i]**2)
+                    speed2 = math.sqrt(vx[j]**2 + vy[j]**2)
+                    dot1 = vx[i] * nx + vy[i] * ny
+                    vx[i] -= 2 * dot1 * nx
+                    vy[i] -= 2 * dot1 * ny
+                    dot2 = vx[j] * nx + vy[j] * ny
+                    vx[j] -= 2 * dot2 * nx
+                    vy[j] -= 2 * dot2 * ny
+                    new_speed1 = math.sqrt(vx[i]**2 + vy[i]**2)
+                    new_speed2 = math.sqrt(vx[j]**2 + vy[j]**2)
+                    if new_speed1 > 0:
+                        vx[i] = vx[i] * speed1 / new_speed1
+                        vy[i] = vy[i] * speed1 / new_speed1
+                    if new_speed2 > 0:
+                        vx[j] = vx[j] * speed2 / new_speed2
+                        vy[j] = vy[j] * speed2 / new_speed2
+
+
+def _state(field):
+    return [list(getattr(field, name)) for name in ('x', 'y', 'vx', 'vy')]
+
+
+# x1 - плотность по умолчанию, x10 - наибольшая в настройках; при x20 толчки
+# выносят ноты за соседние ячейки, в которых их нашла сетка
+@pytest.mark.parametrize('density', [1, 10, 20])
+def test_grid_matches_full_scan_bit_for_bit(density, monkeypatch):
+    fields = [_field(density, use_numpy=False)]
+    if particles.np is not None:
+        fields.append(_field(density, use_numpy=True))
+    reference = _field(density, use_numpy=False)
+    resolve = particles._resolve_collisions
+    for frame in range(30):
+        # Курсор проходит через поле, чтобы задеть и отталкивание
+        mouse = (100 + frame * 10, 280)
+        monkeypatch.setattr(particles, '_resolve_collisions', _full_scan)
+        reference.step(1 / 60, *mouse)
+        monkeypatch.setattr(particles, '_resolve_collisions', resolve)
+        for field in fields:
+            field.step(1 / 60, *mouse)
+            assert _state(field) == _state(reference), f"кадр {frame}, numpy={field.use_numpy}"
+
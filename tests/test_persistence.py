@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+
+from pomodoro_timer import persistence
+from pomodoro_timer.persistence import DeferredWriter, FileWatcher
+
+
+def _rewrite(path, data):
+    """Внешняя правка: другой размер и новый inode, как у os.replace()"""
+    tmp_path = f"{path}.external"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def test_watcher_reports_external_rewrite_once(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    watcher = FileWatcher(str(path), interval=0)
+    assert not watcher.changed()
+    _rewrite(path, {'work_time': 30})
+    assert watcher.changed()
+    assert not watcher.changed()
+
+
+def test_watcher_throttles_stat(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    watcher = FileWatcher(str(path), interval=3600)
+    _rewrite(path, {'work_time': 30})
+    assert not watcher.changed()  # Следующая проверка ещё не наступила
+
+
+def test_watcher_ignores_deleted_file(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    watcher = FileWatcher(str(path), interval=0)
+    path.unlink()
+    assert not watcher.changed()
+
+
+def test_own_write_is_not_reported(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    watcher = FileWatcher(str(path), interval=0)
+    writer = DeferredWriter(str(path), delay=0, watcher=watcher)
+    writer.schedule({'work_time': 40})
+    writer.close()
+    assert json.loads(path.read_text()) == {'work_time': 40}
+    assert not watcher.changed()
+
+
+def test_check_during_own_write_is_skipped(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{}')
+    watcher = FileWatcher(str(path), interval=0)
+    written = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with watcher.own_write():
+            _rewrite(path, {'work_time': 40})
+            written.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    written.wait(5)
+    # Файл уже новый, но подпись ещё не запомнена: проверка не должна
+    # ни сообщить об изменении, ни ждать окончания записи
+    assert not watcher.changed()
+    release.set()
+    thread.join()
+    assert not watcher.changed()
+
+
+def test_writer_coalesces_burst_into_one_write(tmp_path, monkeypatch):
+    path = tmp_path / 'settings.json'
+    writes = []
+    done = threading.Event()
+    real_write = persistence.write_json_atomic
+
+    def counting_write(target, data):
+        real_write(target, data)
+        writes.append(data)
+        done.set()
+
+    monkeypatch.setattr(persistence, 'write_json_atomic', counting_write)
+    writer = DeferredWriter(str(path), delay=0.2)
+    for value in range(1, 11):
+        writer.schedule({'work_time': value})
+    assert not path.exists()  # Запись отложена
+    assert done.wait(5)
+    writer.close()
+    assert writes == [{'work_time': 10}]
+    assert json.loads(path.read_text()) == {'work_time': 10}
+
+
+def test_flush_writes_pending_snapshot_synchronously(tmp_path):
+    path = tmp_path / 'settings.json'
+    writer = DeferredWriter(str(path), delay=3600)
+    writer.schedule({'work_time': 25})
+    writer.flush()
+    assert json.loads(path.read_text()) == {'work_time': 25}
+    writer.cancel()
+    writer.close()
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text('{"work_time": 25}')
+    writer = DeferredWriter(str(path), delay=3600)
+    writer.schedule({'bad': object()})  # Не сериализуется в JSON
+    writer.close()
+    assert json.loads(path.read_text()) == {'work_time': 25}
+    assert os.listdir(tmp_path) == ['settings.json']  # Временный файл удалён
@@ -0,0 +1,84 @@
+"""Протокол и планировщик сервера таймеров"""
+
+import asyncio
+import json
+
+from pomodoro_timer import server
+from pomodoro_timer.core import PHASE_COMPLETE, SHORT_BREAK, WORK
+
+
+async def _exchange(lines, patch=None):
+    """Отправляет строки одному соединению и возвращает ответы по порядку"""
+    listener, sessions = await server.start_server('127.0.0.1:0')
+    if patch:
+        patch(sessions)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    replies = []
+    try:
+        for line in lines:
+            writer.write(line.encode('utf-8') + b'\n')
+            await writer.drain()
+            replies.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+    return replies
+
+
+def test_malformed_requests_get_errors_and_keep_connection():
+    bad = [
+        '{"cmd": "create", "work": Infinity}',
+        '{"cmd": "create", "work": NaN}',
+        '{"cmd": "create", "work": -5}',
+        '{"cmd": "create", "work": 1e12}',
+        '{"cmd": "create", "work": true}',
+        '{"cmd": "create", "work": "25"}',
+        '[1, 2]',
+        'not json',
+        '{"cmd": "bogus"}',
+        '{"cmd": "start", "session": 999}',
+        '{"cmd": "status", "session": [1]}',
+    ]
+    replies = asyncio.run(_exchange(bad + ['{"id": 7, "cmd": "create", "work": 60}']))
+    for line, reply in zip(bad, replies):
+        assert reply['ok'] is False, line
+        assert reply['error']
+    assert replies[-1]['ok'] is True
+    assert replies[-1]['id'] == 7
+    assert replies[-1]['remaining'] == 60
+
+
+def test_internal_error_does_not_drop_connection():
+    def patch(sessions):
+        def broken(request, writer, subscriptions):
+            if request.get('cmd') == 'stats':
+                raise RuntimeError("boom")
+            return type(sessions).handle(sessions, request, writer, subscriptions)
+        sessions.handle = broken
+
+    replies = asyncio.run(_exchange(['{"id": 1, "cmd": "stats"}', '{"cmd": "create"}'], patch))
+    assert replies[0] == {'ok': False, 'error': "внутренняя ошибка сервера", 'id': 1}
+    assert replies[1]['ok'] is True
+
+
+def test_service_notifies_phase_complete_and_skips_paused():
+    async def scenario():
+        notified = []
+        service = server.TimerService(lambda sid, session, event, late: notified.append((sid, event)))
+        done = service.create(0.05, 0.05, 0.05)
+        paused = service.create(0.05, 0.05, 0.05)
+        service.start(done)
+        service.start(paused)
+        service.pause(paused)
+        await asyncio.sleep(0.2)
+        return service, done, notified
+
+    service, done, notified = asyncio.run(scenario())
+    assert [(sid, event.kind, event.phase) for sid, event in notified] == [(done, PHASE_COMPLETE, WORK)]
+    # Новая фаза начинается на паузе
+    core = service.sessions[done].core
+    assert core.phase == SHORT_BREAK and not core.is_running
+    # Устаревшая запись поставленной на паузу сессии выброшена при извлечении
+    assert service.stats()['heap'] == 0